@@ -2,25 +2,112 @@
 # File: db.py
 # -----------------------------
 from __future__ import annotations
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import sessionmaker
 from models import Base, ensure_service_catalog_columns
 import os
 
+# Applied once per new DBAPI connection in a single executescript call.
+# WAL + synchronous=NORMAL avoids an fsync on every commit while staying crash-safe.
+# pysqlite can't take PRAGMAs in the URL; anything sqlite3.connect() accepts goes
+# through SQLITE_CONNECT_ARGS instead so it is applied when the handle is opened.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA mmap_size=268435456;"
+    "PRAGMA cache_size=-32768;"
+    "PRAGMA foreign_keys=ON;"
+)
+
+# timeout= is sqlite3's busy handler (same as PRAGMA busy_timeout=5000).
+# Pooled connections can be handed to whichever thread checks them out.
+SQLITE_CONNECT_ARGS = {"timeout": 5.0, "check_same_thread": False}
+
+# Small fixed pool: the UI opens many short sessions, so keep the DBAPI
+# connections (and their applied PRAGMAs / WAL handles) alive between them.
+SQLITE_POOL_ARGS = dict(poolclass=QueuePool, pool_size=5, max_overflow=5,
+                        pool_pre_ping=False, pool_recycle=-1)
+
+# Stored in PRAGMA user_version once the schema heal has run.
+# Bump this whenever models/ensure_* gain a table or column.
+SCHEMA_VERSION = 7
+
+
+def apply_sqlite_pragmas(dbapi_conn, conn_record):
+    dbapi_conn.executescript(SQLITE_PRAGMAS)
+
+
+def optimize_sqlite_on_close(dbapi_conn, conn_record):
+    """Let SQLite refresh planner stats (sqlite_stat1) before a pooled connection goes away."""
+    try:
+        dbapi_conn.execute("PRAGMA optimize")
+    except Exception:
+        pass  # connection already unusable; nothing to optimize
+
 
 def init_engine_and_session(db_url: str):
-    if db_url.startswith("sqlite"):
+    is_sqlite = db_url.startswith("sqlite")
+    if is_sqlite:
         os.makedirs("data", exist_ok=True)
-    engine = create_engine(db_url, echo=False, future=True)
-
-    # --- auto-fix missing columns (safe for SQLite) ---
-    ensure_service_catalog_columns(engine)
+    # URI-form URLs (sqlite:///file:...?cache=shared&uri=true) are passed through as-is
+    file_db = (is_sqlite and ":memory:" not in db_url and "mode=memory" not in db_url
+               and db_url.rstrip("/") != "sqlite:")
+    extra = dict(SQLITE_POOL_ARGS) if file_db else {}
+    engine = create_engine(
+        db_url, echo=False, future=True,
+        connect_args=dict(SQLITE_CONNECT_ARGS) if is_sqlite else {},
+        **extra,
+    )
+    if is_sqlite:
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+        event.listen(engine, "close", optimize_sqlite_on_close)
 
     SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
     return engine, SessionLocal
 
 
-def ensure_schema(engine):
-    """Create any missing tables, then verify key columns exist."""
-    Base.metadata.create_all(engine)
+def _sqlite_user_version(engine) -> int | None:
+    if engine.dialect.name != "sqlite":
+        return None
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def _all_tables_exist(engine) -> bool:
+    """One sqlite_master query instead of create_all's per-table reflection."""
+    if engine.dialect.name != "sqlite":
+        return False
+    names = sorted(Base.metadata.tables)
+    marks = ",".join("?" * len(names))
+    with engine.connect() as conn:
+        n = conn.exec_driver_sql(
+            f"SELECT count(*) FROM sqlite_master WHERE type='table' AND name IN ({marks})",
+            tuple(names),
+        ).scalar()
+    return n == len(names)
+
+
+def ensure_schema(engine, heal=None):
+    """
+    Create any missing tables, then verify key columns exist.
+    `heal` is an optional extra callable (e.g. main.ensure_sqlite_columns) run in the same pass.
+    On SQLite this is skipped entirely once user_version matches SCHEMA_VERSION.
+    """
+    if _sqlite_user_version(engine) == SCHEMA_VERSION:
+        return
+    if not _all_tables_exist(engine):
+        Base.metadata.create_all(engine)
     ensure_service_catalog_columns(engine)
+    if heal is not None:
+        heal()
+    # create_all only indexes tables it creates; add declared indexes missing from
+    # older tables too (after the heal, so indexed columns added by it exist)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for idx in table.indexes:
+                idx.create(conn, checkfirst=True)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {int(SCHEMA_VERSION)}")
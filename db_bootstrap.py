@@ -1,23 +1,14 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 import os, sqlite3
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.engine import Engine
+
+from db import init_engine_and_session
 
 # Use your actual DB file
 DB_PATH = os.path.join("data", "fpc.db")
 
-engine = create_engine(f"sqlite:///{DB_PATH}", future=True)
-
-# Ensure SQLite honors ON DELETE CASCADE on every connection
-@event.listens_for(Engine, "connect")
-def _set_sqlite_pragma(dbapi_conn, conn_record):
-    cur = dbapi_conn.cursor()
-    cur.execute("PRAGMA foreign_keys=ON")
-    cur.close()
-
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+# Same engine setup as the app (pool + per-connection PRAGMAs); no separate global hook
+engine, SessionLocal = init_engine_and_session(f"sqlite:///{DB_PATH}")
 
 def ensure_sqlite_columns():
     """
@@ -29,13 +20,14 @@ def ensure_sqlite_columns():
     con = sqlite3.connect(DB_PATH)
     cur = con.cursor()
 
-    def has_col(table: str, name: str) -> bool:
+    def cols(table: str) -> set[str]:
         cur.execute(f"PRAGMA table_info({table})")
-        return any(r[1] == name for r in cur.fetchall())
+        return {r[1] for r in cur.fetchall()}
 
     # Add invoices.invoice_no if missing
     try:
-        if not has_col("invoices", "invoice_no"):
+        existing = cols("invoices")
+        if existing and "invoice_no" not in existing:
             cur.execute("ALTER TABLE invoices ADD COLUMN invoice_no TEXT")
     except sqlite3.OperationalError:
         # table may not exist yet on a fresh DB
@@ -3,19 +3,27 @@ import pathlib
 
 p = pathlib.Path(r"C:\Users\tyler\Desktop\FoundersSOManager\models.py")
 
-# Read with Windows-1252 to safely decode curly quotes/dashes
-s = p.read_text(encoding="cp1252", errors="strict")
+# Normalize curly quotes/dashes to ASCII (built once; str.translate uses the C fast path)
+TRANS = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201A": "'", "\u2032": "'", "\u2035": "'",  # single quotes/prime
+    "\u201C": '"', "\u201D": '"', "\u201E": '"', "\u2033": '"', "\u2036": '"',  # double quotes
+    "\u2013": "-", "\u2014": "-", "\u2212": "-",                                # dashes/minus
+})
 
-# Normalize curly quotes/dashes to ASCII
-trans = {
-    0x2018:"'", 0x2019:"'", 0x201A:"'", 0x2032:"'", 0x2035:"'",  # single quotes/prime
-    0x201C:'"', 0x201D:'"', 0x201E:'"', 0x2033:'"', 0x2036:'"',  # double quotes
-    0x2013:"-", 0x2014:"-", 0x2212:"-",                          # dashes/minus
-}
-s = s.translate(trans)
+# cp1252 bytes that decode to one of the characters above
+SMART_BYTES = (0x82, 0x84, 0x91, 0x92, 0x93, 0x94, 0x96, 0x97)
 
-# Ensure UTF-8 coding cookie at top
 header = "# -*- coding: utf-8 -*-\n"
+
+raw = p.read_bytes()
+if not any(b in raw for b in SMART_BYTES) and raw.lstrip().startswith(header.encode("ascii")):
+    print("models.py already normalized; nothing to do.")
+    raise SystemExit(0)
+
+# Read with Windows-1252 to safely decode curly quotes/dashes
+s = raw.decode("cp1252", errors="strict").translate(TRANS)
+
+# Ensure UTF-8 coding cookie at top
 if not s.lstrip().startswith(header):
     s = header + s
 
@@ -3,6 +3,7 @@
 # -----------------------------
 from __future__ import annotations
 
+import functools
 import os
 import sys
 import sqlite3
@@ -12,10 +13,8 @@ from PySide6.QtCore import Qt, QCoreApplication, QTimer, QObject
 from PySide6.QtGui import QPalette, QColor
 from PySide6.QtWidgets import QApplication, QMessageBox
 
-from sqlalchemy import event
-
-from db import init_engine_and_session, ensure_schema
-from ui.main_window import MainWindow
+# db/models (SQLAlchemy) and the UI tree are imported inside the functions that
+# need them, so QApplication comes up before those heavy imports run.
 
 APP_NAME = "Founders PW - SO Manager"
 FORCE_LIGHT_PALETTE = True  # set False if you want to follow OS theme
@@ -29,30 +28,22 @@ def _enable_qt_scaling():
 def _sqlite_path_from_db_url(db_url: str) -> Optional[str]:
     """
     Extract a filesystem path from a URL like sqlite:///data/fpc.db
+    (or the URI form sqlite:///file:data/fpc.db?cache=shared&uri=true).
     Returns None for non-sqlite URLs.
     """
     if not db_url:
         return None
     lower = db_url.lower()
     if lower.startswith("sqlite:///"):
-        return db_url.split("sqlite:///", 1)[1]
+        path = db_url.split("sqlite:///", 1)[1]
+        if path.startswith("file:"):
+            path = path[len("file:"):]
+        return path.split("?", 1)[0] or None
     if lower.startswith("sqlite://"):
         return None
     return None
 
 
-def _enable_sqlite_foreign_keys(engine):
-    """
-    Ensure SQLite cascade deletes run by turning on foreign_keys at connect time.
-    Uses the engine you already create via init_engine_and_session.
-    """
-    def _fk_on(dbapi_conn, conn_record):
-        cur = dbapi_conn.cursor()
-        cur.execute("PRAGMA foreign_keys=ON")
-        cur.close()
-    event.listen(engine, "connect", _fk_on, once=False)
-
-
 def ensure_sqlite_columns(db_path: Optional[str]):
     """
     Lightweight self-heal for dev DBs.
@@ -64,70 +55,150 @@ def ensure_sqlite_columns(db_path: Optional[str]):
     if not db_path or not os.path.exists(db_path):
         return
 
-    con = sqlite3.connect(db_path)
-    cur = con.cursor()
+    from models import EPOCH_NOW_SQL
 
-    def table_exists(name: str) -> bool:
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?;", (name,))
-        return cur.fetchone() is not None
-
-    def has_col(table: str, name: str) -> bool:
-        cur.execute(f"PRAGMA table_info({table})")
-        return any(r[1] == name for r in cur.fetchall())
-
-    # 1) service_catalog table
-    if not table_exists("service_catalog"):
-        cur.execute("""
-        CREATE TABLE service_catalog (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL UNIQUE,
-            default_price_cents INTEGER NOT NULL DEFAULT 0,
-            active INTEGER NOT NULL DEFAULT 1,
-            created_at DATETIME
-        )
-        """)
-
-    # 2) site_services: catalog_id + unit_price_cents
-    if table_exists("site_services"):
-        if not has_col("site_services", "catalog_id"):
-            cur.execute("ALTER TABLE site_services ADD COLUMN catalog_id INTEGER")
-        if not has_col("site_services", "unit_price_cents"):
-            cur.execute("ALTER TABLE site_services ADD COLUMN unit_price_cents INTEGER NOT NULL DEFAULT 0")
-        if not has_col("site_services", "active"):
-            cur.execute("ALTER TABLE site_services ADD COLUMN active INTEGER NOT NULL DEFAULT 1")
-
-    # 3) so_services: unit_price_cents snapshot
-    if table_exists("so_services"):
-        if not has_col("so_services", "unit_price_cents"):
-            cur.execute("ALTER TABLE so_services ADD COLUMN unit_price_cents INTEGER NOT NULL DEFAULT 0")
-
-    # 4) invoices: ensure all model columns exist
-    invoice_cols = [
-        ("invoice_no", "TEXT"),
-        ("invoice_date", "DATE"),
-        ("due_date", "DATE"),
-        ("subtotal_cents", "INTEGER"),
-        ("tax_cents", "INTEGER"),
-        ("total_cents", "INTEGER"),
-        ("paid", "INTEGER"),
-        ("notes", "TEXT"),
-        ("pdf_path", "TEXT"),
-        ("created_at", "DATETIME"),
-    ]
-    if table_exists("invoices"):
-        for col, sqltype in invoice_cols:
-            if not has_col("invoices", col):
-                cur.execute(f"ALTER TABLE invoices ADD COLUMN {col} {sqltype}")
-
-    con.commit()
-    con.close()
+    # Manual transaction control: the probes and every change below run under one
+    # write lock (BEGIN IMMEDIATE) and land with a single commit.
+    con = sqlite3.connect(db_path, isolation_level=None)
+    cur = con.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        # one sqlite_master read up front instead of a prepared probe per table
+        # (a table created below is new and already current, so later steps skip it)
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = {r[0] for r in cur.fetchall()}
+
+        def table_exists(name: str) -> bool:
+            return name in tables
+
+        # one PRAGMA table_info per table; membership checks are then dict lookups
+        # (column name -> declared default, None when there is no DEFAULT clause)
+        _cols_cache: dict[str, dict[str, str | None]] = {}
+
+        def cols(table: str) -> dict[str, str | None]:
+            if table not in _cols_cache:
+                cur.execute(f"PRAGMA table_info({table})")
+                _cols_cache[table] = {r[1]: r[4] for r in cur.fetchall()}
+            return _cols_cache[table]
+
+        # schema changes are collected and applied together at the end,
+        # so the schema cookie bumps (and cached statements are invalidated) once
+        alters: list[str] = []
+
+        def add_missing(table: str, wanted: list[tuple[str, str]]):
+            existing = cols(table)
+            for col, decl in wanted:
+                if col not in existing:
+                    alters.append(f"ALTER TABLE {table} ADD COLUMN {col} {decl}")
+                    existing[col] = None
+
+        # 1) service_catalog table
+        if not table_exists("service_catalog"):
+            alters.append("""
+            CREATE TABLE service_catalog (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                default_price_cents INTEGER NOT NULL DEFAULT 0,
+                active INTEGER NOT NULL DEFAULT 1,
+                created_at INTEGER DEFAULT (CAST(strftime('%s','now') AS INTEGER))
+            )
+            """)
+
+        # 2) site_services: catalog_id + unit_price_cents
+        if table_exists("site_services"):
+            add_missing("site_services", [
+                ("catalog_id", "INTEGER"),
+                ("unit_price_cents", "INTEGER NOT NULL DEFAULT 0"),
+                ("active", "INTEGER NOT NULL DEFAULT 1"),
+            ])
+
+        # 3) so_services: unit_price_cents snapshot
+        if table_exists("so_services"):
+            add_missing("so_services", [("unit_price_cents", "INTEGER NOT NULL DEFAULT 0")])
+
+        # 4) invoices: ensure all model columns exist
+        invoice_cols = [
+            ("invoice_no", "TEXT"),
+            ("invoice_date", "INTEGER"),
+            ("due_date", "INTEGER"),
+            ("subtotal_cents", "INTEGER"),
+            ("tax_cents", "INTEGER"),
+            ("total_cents", "INTEGER"),
+            ("paid", "INTEGER"),
+            ("notes", "TEXT"),
+            ("pdf_path", "TEXT"),
+            ("created_at", "INTEGER"),
+        ]
+        if table_exists("invoices"):
+            add_missing("invoices", invoice_cols)
+
+        # 4b) payment_profiles: display fields live in details_json; fold the
+        #     legacy per-field columns into it, then drop them (SQLite >= 3.35)
+        legacy_pp = [
+            "ach_routing", "ach_account", "card_brand", "card_last4", "card_name",
+            "card_exp_month", "card_exp_year", "bill_street", "bill_city_state_zip",
+        ]
+        if table_exists("payment_profiles"):
+            add_missing("payment_profiles", [("details_json", "TEXT DEFAULT ''")])
+            present = [c for c in legacy_pp if c in cols("payment_profiles")]
+            if present:
+                pairs = ", ".join(f"'{c}', {c}" for c in present)
+                alters.append(
+                    f"UPDATE payment_profiles SET details_json = json_object({pairs}) "
+                    f"WHERE details_json IS NULL OR details_json = ''"
+                )
+                if sqlite3.sqlite_version_info >= (3, 35, 0):
+                    alters.extend(f"ALTER TABLE payment_profiles DROP COLUMN {c}" for c in present)
+
+        # 5) timestamps: the ORM leaves these to a server default. Columns created
+        #    before that (or added above; SQLite can't ALTER in a non-constant
+        #    default) get an AFTER INSERT trigger that fills them instead.
+        timestamp_cols = [
+            ("customers", "created_at"), ("sites", "created_at"), ("service_orders", "created_at"),
+            ("attachments", "created_at"), ("payment_profiles", "created_at"), ("employees", "created_at"),
+            ("so_assignments", "assigned_at"), ("invoices", "created_at"), ("service_catalog", "created_at"),
+            ("site_services", "created_at"),
+        ]
+        for table, col in timestamp_cols:
+            if not table_exists(table):
+                continue
+            existing = cols(table)
+            if col in existing and existing[col] not in (EPOCH_NOW_SQL, f"({EPOCH_NOW_SQL})"):
+                alters.append(f"DROP TRIGGER IF EXISTS trg_{table}_{col}_default")
+                alters.append(
+                    f"CREATE TRIGGER trg_{table}_{col}_default AFTER INSERT ON {table} "
+                    f"FOR EACH ROW WHEN typeof(NEW.{col}) <> 'integer' BEGIN "
+                    f"UPDATE {table} SET {col} = {EPOCH_NOW_SQL} WHERE rowid = NEW.rowid; END"
+                )
+
+        # 6) dates/timestamps are INTEGER epoch seconds; convert legacy ISO text in place
+        epoch_cols = timestamp_cols + [
+            ("service_orders", "scheduled_date"), ("invoices", "invoice_date"), ("invoices", "due_date"),
+        ]
+        for table, col in epoch_cols:
+            if table_exists(table) and col in cols(table):
+                alters.append(
+                    f"UPDATE {table} SET {col} = CAST(strftime('%s', {col}) AS INTEGER) "
+                    f"WHERE typeof({col}) = 'text'"
+                )
+
+        for stmt in alters:
+            cur.execute(stmt)
+        cur.execute("COMMIT")
+    except Exception:
+        cur.execute("ROLLBACK")
+        raise
+    finally:
+        con.close()
 
 
 # ---------- Global UI helpers ----------
 
-def _apply_light_palette(app: QApplication):
-    """Force a neutral light palette independent of OS dark mode."""
-    app.setStyle("Fusion")
+@functools.cache
+def _light_palette() -> QPalette:
+    """Neutral light palette, built once (lazily, after QApplication exists)."""
     pal = QPalette()
     pal.setColor(QPalette.Window, QColor(245, 245, 245))
     pal.setColor(QPalette.WindowText, QColor(0, 0, 0))
@@ -140,7 +211,13 @@ def _apply_light_palette(app: QApplication):
     pal.setColor(QPalette.ButtonText, QColor(0, 0, 0))
     pal.setColor(QPalette.Highlight, QColor(30, 144, 255))
     pal.setColor(QPalette.HighlightedText, QColor(255, 255, 255))
-    app.setPalette(pal)
+    return pal
+
+
+def _apply_light_palette(app: QApplication):
+    """Force a neutral light palette independent of OS dark mode."""
+    app.setStyle("Fusion")
+    app.setPalette(_light_palette())
 
 
 def _install_global_msgbox_silencer():
@@ -148,59 +225,41 @@ def _install_global_msgbox_silencer():
     Monkey-patch QMessageBox.* so any 'Preview…' or 'NoError' dialog
     is suppressed globally. Returns nothing.
     """
-    _orig_critical = QMessageBox.critical
-    _orig_warning = QMessageBox.warning
-    _orig_information = QMessageBox.information
-    _orig_question = QMessageBox.question
-
-    def _silence_if_preview(parent, title, text, *args, **kwargs):
-        t = (str(title) or "").strip()
-        s = (str(text) or "").strip()
-        if t.startswith("Preview") or s == "NoError":
-            return QMessageBox.Ok  # pretend acknowledged
-        return None
+    _ok = QMessageBox.Ok  # pretend acknowledged
 
     def _wrap(orig_func):
-        def _wrapped(parent, title, text, *args, **kwargs):
-            r = _silence_if_preview(parent, title, text, *args, **kwargs)
-            return r if r is not None else orig_func(parent, title, text, *args, **kwargs)
+        # orig/ok bound as defaults: plain local lookups on every dialog call
+        def _wrapped(parent, title, text, *args, _orig=orig_func, _ok=_ok, **kwargs):
+            if (title and title.startswith("Preview")) or text == "NoError":
+                return _ok
+            return _orig(parent, title, text, *args, **kwargs)
         return staticmethod(_wrapped)
 
-    QMessageBox.critical = _wrap(_orig_critical)
-    QMessageBox.warning = _wrap(_orig_warning)
-    QMessageBox.information = _wrap(_orig_information)
-    QMessageBox.question = _wrap(_orig_question)
+    for name in ("critical", "warning", "information", "question"):
+        setattr(QMessageBox, name, _wrap(getattr(QMessageBox, name)))
 
 
 class _PreviewSweeper(QObject):
-    """Extra safety: close any stray Preview/NoError boxes shortly after startup."""
+    """
+    Extra safety: close any stray Preview/NoError boxes as they are shown.
+    The shared app-wide filter (ui.pdf_preview_silent2) catches QMessageBox Show
+    events; one delayed sweep covers anything already visible before it was installed.
+    """
     def __init__(self, parent=None):
         super().__init__(parent)
-        for ms in (0, 25, 50, 100, 200):
-            QTimer.singleShot(ms, self._sweep)
+        from ui.pdf_preview_silent2 import install_preview_box_filter
+        install_preview_box_filter()
+        QTimer.singleShot(200, self._sweep)
 
     def _sweep(self):
+        from ui.pdf_preview_silent2 import is_preview_box
         app = QApplication.instance()
         if not app:
             return
         for w in app.topLevelWidgets():
-            # we cannot import QMessageBox type-safely here without recursion
-            try:
-                title = getattr(w, "windowTitle", lambda: "")() or ""
-                text = getattr(w, "text", lambda: "")() or ""
-            except Exception:
-                continue
-            title = str(title).strip()
-            text = str(text).strip()
-            if title.startswith("Preview") or text == "NoError":
-                try:
-                    w.done(0)
-                except Exception:
-                    pass
-                try:
-                    w.close()
-                except Exception:
-                    pass
+            if isinstance(w, QMessageBox) and w.isVisible() and is_preview_box(w):
+                w.done(0)
+                w.close()
 
 
 def main():
@@ -216,19 +275,19 @@ def main():
     _install_global_msgbox_silencer()
     _ = _PreviewSweeper(app)
 
+    from db import init_engine_and_session, ensure_schema
+    from ui.main_window import MainWindow
+
     db_url = os.getenv("FPC_DB_URL", "sqlite:///data/fpc.db")
 
     # Build engine + SessionLocal using your existing db.py helpers
+    # (foreign_keys/WAL PRAGMAs are applied per connection there)
     engine, SessionLocal = init_engine_and_session(db_url)
 
-    # Make sure SQLite honors ON DELETE CASCADE on this engine
-    _enable_sqlite_foreign_keys(engine)
-
-    # Create any missing tables
-    ensure_schema(engine)
-
-    # Self-heal columns that the ORM expects (e.g., invoices.invoice_no)
-    ensure_sqlite_columns(_sqlite_path_from_db_url(db_url))
+    # Create any missing tables and self-heal columns the ORM expects
+    # (e.g., invoices.invoice_no); a no-op once the DB is at SCHEMA_VERSION
+    db_path = _sqlite_path_from_db_url(db_url)
+    ensure_schema(engine, heal=lambda: ensure_sqlite_columns(db_path))
 
     # Launch UI
     win = MainWindow(SessionLocal)
@@ -1,15 +1,83 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-from datetime import datetime, date
+from datetime import datetime, date, timedelta, timezone
 from typing import Optional
+import json
 
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Date, UniqueConstraint
+    Column, Integer, String, Text, Boolean, ForeignKey, UniqueConstraint, Index, text
 )
 from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
+# -----------------------------
+# Column types
+# -----------------------------
+# Dates/timestamps are stored as INTEGER Unix seconds (UTC): compact records and
+# integer comparisons for range filters. ISO-8601 TEXT written by older versions is
+# still read; main.ensure_sqlite_columns converts it in place.
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_DATE = date(1970, 1, 1)
+
+# SQL for "now" in the stored representation; used as the server default.
+EPOCH_NOW_SQL = "CAST(strftime('%s','now') AS INTEGER)"
+
+
+class EpochDateTime(TypeDecorator):
+    """Naive-UTC datetime <-> INTEGER epoch seconds."""
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return int((value - _EPOCH).total_seconds())
+        if isinstance(value, date):
+            return (value - _EPOCH_DATE).days * 86400
+        return int(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):  # legacy ISO text
+            return datetime.fromisoformat(value)
+        return _EPOCH + timedelta(seconds=int(value))
+
+
+class EpochDate(TypeDecorator):
+    """date <-> INTEGER epoch seconds at UTC midnight."""
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            value = value.date()
+        if isinstance(value, date):
+            return (value - _EPOCH_DATE).days * 86400
+        return int(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):  # legacy ISO text
+            return date.fromisoformat(value[:10])
+        return _EPOCH_DATE + timedelta(days=int(value) // 86400)
+
+
+def _created_at():
+    """Timestamp column filled by SQLite rather than sent with every INSERT.
+    Older DBs whose columns predate the server default get a fill-in trigger
+    from main.ensure_sqlite_columns."""
+    return Column(EpochDateTime, server_default=text(f"({EPOCH_NOW_SQL})"))
+
 # -----------------------------
 # Core tables
 # -----------------------------
@@ -21,7 +89,7 @@ class Customer(Base):
     phone = Column(String(100), default="")
     email = Column(String(200), default="")
     notes = Column(Text, default="")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = _created_at()
 
     sites = relationship("Site", back_populates="customer", cascade="all, delete-orphan")
     payment_profiles = relationship("PaymentProfile", back_populates="customer", cascade="all, delete-orphan")
@@ -43,7 +111,7 @@ class Site(Base):
     area_zone = Column(String(200), default="")
     cadence_text = Column(String(200), default="")
     notes = Column(Text, default="")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = _created_at()
 
     customer = relationship("Customer", back_populates="sites")
     service_orders = relationship("ServiceOrder", back_populates="site", cascade="all, delete-orphan")
@@ -59,17 +127,20 @@ class ServiceOrder(Base):
     site_id = Column(Integer, ForeignKey("sites.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(200), default="")
     description = Column(Text, default="")
-    scheduled_date = Column(Date, nullable=True)
-    completed = Column(Boolean, default=False)
-    invoiced = Column(Boolean, default=False)
+    scheduled_date = Column(EpochDate, nullable=True)
+    completed = Column(Boolean, default=False, index=True)
+    invoiced = Column(Boolean, default=False, index=True)
     notes = Column(Text, default="")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = _created_at()
 
     site = relationship("Site", back_populates="service_orders")
     invoice = relationship("Invoice", back_populates="service_order", uselist=False, cascade="all, delete-orphan")
     staff_assignments = relationship("ServiceOrderAssignment", back_populates="service_order", cascade="all, delete-orphan")
     so_services = relationship("SOService", back_populates="service_order", cascade="all, delete-orphan")
 
+    # per-site lists and the month view filter on (site_id, scheduled_date)
+    __table_args__ = (Index("ix_so_site_sched", "site_id", "scheduled_date"),)
+
     def __repr__(self):
         return f"SO(id={self.id}, site_id={self.site_id}, scheduled={self.scheduled_date})"
 
@@ -81,12 +152,32 @@ class Attachment(Base):
     entity_id = Column(Integer, nullable=False)
     file_path = Column(Text, nullable=False)
     note = Column(Text, default="")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = _created_at()
 
 # -----------------------------
 # Additive / auxiliary tables
 # -----------------------------
 
+class _DetailField:
+    """Property stored as one key of the owning row's `details_json` dict."""
+    def __init__(self, key: str, default):
+        self.key = key
+        self.default = default
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj._details_dict().get(self.key)
+        return self.default if value is None else value
+
+    def __set__(self, obj, value):
+        d = obj._details_dict()
+        d[self.key] = self.default if value is None else value
+        raw = json.dumps(d, separators=(",", ":"))
+        obj.details_json = raw
+        obj._details_cache = (raw, d)
+
+
 class PaymentProfile(Base):
     __tablename__ = "payment_profiles"
     id = Column(Integer, primary_key=True)
@@ -94,22 +185,49 @@ class PaymentProfile(Base):
 
     method = Column(String(16), default="other")   # "ach", "card", "check", "other"
 
+    # Display-only ACH/card/billing fields, packed into one JSON TEXT column so a
+    # profile is a single short record. Read/write them through the properties below.
+    details_json = Column(Text, default="")
+
     # ACH (display only)
-    ach_routing = Column(String(32), default="")
-    ach_account = Column(String(32), default="")
+    ach_routing = _DetailField("ach_routing", "")
+    ach_account = _DetailField("ach_account", "")
 
     # Card (display only)
-    card_brand = Column(String(32), default="")
-    card_last4 = Column(String(8), default="")
-    card_name = Column(String(200), default="")
-    card_exp_month = Column(Integer, default=0)
-    card_exp_year = Column(Integer, default=0)
+    card_brand = _DetailField("card_brand", "")
+    card_last4 = _DetailField("card_last4", "")
+    card_name = _DetailField("card_name", "")
+    card_exp_month = _DetailField("card_exp_month", 0)
+    card_exp_year = _DetailField("card_exp_year", 0)
+
+    bill_street = _DetailField("bill_street", "")
+    bill_city_state_zip = _DetailField("bill_city_state_zip", "")
 
-    bill_street = Column(Text, default="")
-    bill_city_state_zip = Column(String(200), default="")
+    @property
+    def details(self) -> dict:
+        return dict(self._details_dict())
+
+    def _details_dict(self) -> dict:
+        """
+        details_json parsed once and reused while the column holds the same string;
+        assigning the column or reloading it from the DB yields a new string, which
+        drops the cached dict.
+        """
+        raw = self.details_json
+        cached = self.__dict__.get("_details_cache")
+        if cached is not None and cached[0] is raw:
+            return cached[1]
+        try:
+            d = json.loads(raw or "{}")
+        except ValueError:
+            d = {}
+        if not isinstance(d, dict):
+            d = {}
+        self._details_cache = (raw, d)
+        return d
 
     is_default = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = _created_at()
 
     customer = relationship("Customer", back_populates="payment_profiles")
 
@@ -125,7 +243,7 @@ class Employee(Base):
     phone = Column(String(100), default="")
     email = Column(String(200), default="")
     active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = _created_at()
 
     assignments = relationship("ServiceOrderAssignment", back_populates="employee", cascade="all, delete-orphan")
 
@@ -138,12 +256,15 @@ class ServiceOrderAssignment(Base):
     id = Column(Integer, primary_key=True)
     service_order_id = Column(Integer, ForeignKey("service_orders.id", ondelete="CASCADE"), nullable=False)
     employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
-    assigned_at = Column(DateTime, default=datetime.utcnow)
+    assigned_at = _created_at()
 
     service_order = relationship("ServiceOrder", back_populates="staff_assignments")
     employee = relationship("Employee", back_populates="assignments")
 
-    __table_args__ = (UniqueConstraint("service_order_id", "employee_id", name="uq_so_employee"),)
+    __table_args__ = (
+        UniqueConstraint("service_order_id", "employee_id", name="uq_so_employee"),
+        Index("ix_assign_employee", "employee_id"),
+    )
 
 # -----------------------------
 # Invoicing
@@ -154,9 +275,9 @@ class Invoice(Base):
     id = Column(Integer, primary_key=True)
     service_order_id = Column(Integer, ForeignKey("service_orders.id", ondelete="CASCADE"), nullable=False, unique=True)
 
-    invoice_no = Column(String(64), nullable=False)
-    invoice_date = Column(Date, nullable=True)
-    due_date = Column(Date, nullable=True)
+    invoice_no = Column(String(64), nullable=False, index=True)
+    invoice_date = Column(EpochDate, nullable=True)
+    due_date = Column(EpochDate, nullable=True)
 
     subtotal_cents = Column(Integer, default=0)
     tax_cents = Column(Integer, default=0)
@@ -165,10 +286,12 @@ class Invoice(Base):
     paid = Column(Boolean, default=False)
     notes = Column(Text, default="")
     pdf_path = Column(Text, default="")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = _created_at()
 
     service_order = relationship("ServiceOrder", back_populates="invoice")
 
+    __table_args__ = (Index("ix_inv_paid_date", "paid", "invoice_date"),)
+
     def __repr__(self):
         return f"Invoice(id={self.id}, so_id={self.service_order_id}, no={self.invoice_no})"
 
@@ -187,7 +310,7 @@ class ServiceCatalog(Base):
     default_price_cents = Column(Integer, nullable=False, default=0)
     description = Column(Text, default="")  # new
     active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = _created_at()
 
     # Dollars-facing property used by Catalog Manager UI
     @property
@@ -215,7 +338,7 @@ class SiteService(Base):
     site_id = Column(Integer, ForeignKey("sites.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(200), nullable=False)  # legacy free-text name (kept for compatibility)
     active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = _created_at()
 
     # link to catalog + pricing override
     catalog_id = Column(Integer, ForeignKey("service_catalog.id", ondelete="SET NULL"), nullable=True)
@@ -225,7 +348,10 @@ class SiteService(Base):
     catalog = relationship("ServiceCatalog")
     so_links = relationship("SOService", back_populates="site_service", cascade="all, delete-orphan")
 
-    __table_args__ = (UniqueConstraint("site_id", "name", name="uq_site_service_name"),)
+    __table_args__ = (
+        UniqueConstraint("site_id", "name", name="uq_site_service_name"),
+        Index("ix_site_service_active", "site_id", "active"),
+    )
 
     def __repr__(self):
         return f"SiteService(id={self.id}, site_id={self.site_id}, name={self.name}, price={self.unit_price_cents})"
@@ -2,11 +2,16 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 from datetime import date, timedelta
-import calendar
+import functools
+import os
+import re
 from typing import Optional, Iterable, Tuple, List
+from contextlib import contextmanager
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy.orm import Session, load_only, joinedload, selectinload, raiseload
+from sqlalchemy import select, func, insert, update, delete, case, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from models import (
     Customer, Site, ServiceOrder, Attachment,
@@ -14,9 +19,24 @@ from models import (
     SiteService, SOService, ServiceCatalog,
 )
 
+# Dev/test guardrail: with SO_STRICT_LOADING set, hot-path queries raise on any
+# relationship they did not eager-load instead of silently lazy-loading (N+1).
+_STRICT_LOADING = bool(os.environ.get("SO_STRICT_LOADING"))
+
+def _hot_path(*options):
+    return options + (raiseload("*"),) if _STRICT_LOADING else options
+
+# Dialect INSERTs that support ON CONFLICT DO NOTHING (see Repo.assign_employee)
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
 # ---------- cadence helpers ----------
+_DIM = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _is_leap(y: int) -> bool:
+    return y % 4 == 0 and (y % 100 != 0 or y % 400 == 0)
+
 def _eom(y: int, m: int) -> int:
-    return calendar.monthrange(y, m)[1]
+    return 29 if m == 2 and _is_leap(y) else _DIM[m - 1]
 
 def _add_month_clamped(d: date) -> date:
     y, m = d.year, d.month
@@ -26,75 +46,156 @@ def _add_month_clamped(d: date) -> date:
         m += 1
     return date(y, m, min(d.day, _eom(y, m)))
 
+@functools.lru_cache(maxsize=1024)
 def _nth_weekday_of_month(y: int, m: int, weekday_idx: int, n: int) -> date:
-    first_weekday, dim = calendar.monthrange(y, m)
+    first_weekday, dim = date(y, m, 1).weekday(), _eom(y, m)
     offset = (weekday_idx - first_weekday) % 7
     day = 1 + offset + (n - 1) * 7
     if day > dim:
         day = dim
     return date(y, m, day)
 
+# Cadence codes are a handful of distinct strings, so parsing and titles are
+# memoized; only the date math runs per call.
+_CADENCE_TABLE = {
+    # code: (title, fixed step; None = same day next month)
+    "weekly": ("Weekly Cleaning", timedelta(days=7)),
+    "biweekly": ("Biweekly Cleaning", timedelta(days=14)),
+    "monthly_same_day": ("Monthly Cleaning", None),
+}
+_NTH_RE = re.compile(r"^monthly_nth_wd:(-?\d+):(-?\d+)$")
+_ORDINALS = {1: "1st", 2: "2nd", 3: "3rd", 4: "4th"}
+_WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+@functools.lru_cache(maxsize=256)
+def _parse_cadence(code: str) -> tuple:
+    """(code,) for table codes / ("monthly_nth_wd", n, w);
+    ("monthly_bad",) for an unparsable monthly_nth_wd code, ("",) for anything else."""
+    if code in _CADENCE_TABLE:
+        return (code,)
+    m = _NTH_RE.match(code)
+    if m:
+        return ("monthly_nth_wd", int(m[1]), int(m[2]))
+    if code.startswith("monthly_nth_wd:"):
+        return ("monthly_bad",)
+    return ("",)
+
+@functools.lru_cache(maxsize=256)
 def _title_from_cadence(code: str) -> str:
-    if not code:
-        return "Cleaning"
-    if code == "weekly":
-        return "Weekly Cleaning"
-    if code == "biweekly":
-        return "Biweekly Cleaning"
-    if code == "monthly_same_day":
+    kind, *args = _parse_cadence(code or "")
+    if kind in _CADENCE_TABLE:
+        return _CADENCE_TABLE[kind][0]
+    if kind == "monthly_nth_wd":
+        n, w = args
+        if -7 <= w < 7:
+            return f"Monthly {_ORDINALS.get(n, f'{n}th')} {_WEEKDAYS[w]} Cleaning"
+        return "Monthly Cleaning"
+    if kind == "monthly_bad":
         return "Monthly Cleaning"
-    if code.startswith("monthly_nth_wd:"):
-        try:
-            _, n, w = code.split(":")
-            n = int(n); w = int(w)
-            nth = {1: "1st", 2: "2nd", 3: "3rd", 4: "4th"}.get(n, f"{n}th")
-            weekday = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"][w]
-            return f"Monthly {nth} {weekday} Cleaning"
-        except Exception:
-            return "Monthly Cleaning"
     return "Cleaning"
 
 def _next_due_from_cadence(code: str, base: date) -> date:
-    if not code:
-        return base
-    if code == "weekly":
-        return base + timedelta(days=7)
-    if code == "biweekly":
-        return base + timedelta(days=14)
-    if code == "monthly_same_day":
-        return _add_month_clamped(base)
-    if code.startswith("monthly_nth_wd:"):
+    kind, *args = _parse_cadence(code or "")
+    entry = _CADENCE_TABLE.get(kind)
+    if entry:
+        step = entry[1]
+        return base + step if step else _add_month_clamped(base)
+    if kind == "monthly_nth_wd":
+        n, w = args
         try:
-            _, n, w = code.split(":")
-            n = int(n); w = int(w)
             y, m = base.year, base.month
             if m == 12:
                 y, m = y + 1, 1
             else:
                 m += 1
             return _nth_weekday_of_month(y, m, w, n)
-        except Exception:
+        except ValueError:
             return _add_month_clamped(base)
+    if kind == "monthly_bad":
+        return _add_month_clamped(base)
     return base
 # -------------------------------------
 
 
 class Repo:
+    # Bulk writes: prefer self.s.execute(insert(Model), [dict, ...]) over add() in a
+    # loop; SQLAlchemy 2.0 batches it into one executemany by default.
     def __init__(self, session: Session):
         self.s = session
+        self._tx_depth = 0
+
+    # ---------------- Transactions ----------------
+    @contextmanager
+    def transaction(self):
+        """
+        Group several repo calls under one COMMIT:
+
+            with repo.transaction():
+                c = repo.create_customer(...)
+                repo.create_payment_profile(customer_id=c.id, ...)
+
+        Inside the block the CRUD methods only flush (PKs are still populated);
+        the outermost block commits on success and rolls back on error.
+        Calls made outside any block keep committing on their own.
+        """
+        self._tx_depth += 1
+        try:
+            yield self
+        except Exception:
+            self._tx_depth -= 1
+            if not self._tx_depth:
+                self.s.rollback()
+            raise
+        self._tx_depth -= 1
+        if not self._tx_depth:
+            self.s.commit()
+
+    def _commit(self):
+        if self._tx_depth:
+            self.s.flush()
+        else:
+            self.s.commit()
 
     # ---------------- Catalog ----------------
-    def list_catalog(self, active_only: bool = True) -> list[ServiceCatalog]:
-        q = select(ServiceCatalog)
+    # List queries load only the columns the list/table UIs show; anything else
+    # (notes, created_at, ...) is deferred and loads on first access.
+    @staticmethod
+    def _catalog_filter(q, active_only: bool, needle: Optional[str]):
         if active_only:
             q = q.where(ServiceCatalog.active == True)
-        return list(self.s.scalars(q.order_by(ServiceCatalog.name)))
+        for t in (needle or "").lower().split():
+            q = q.where(or_(
+                func.lower(ServiceCatalog.name).contains(t, autoescape=True),
+                func.lower(func.coalesce(ServiceCatalog.description, "")).contains(t, autoescape=True),
+            ))
+        return q
+
+    def _catalog_query(self, active_only: bool, needle: Optional[str] = None):
+        q = select(ServiceCatalog).options(load_only(
+            ServiceCatalog.id, ServiceCatalog.name, ServiceCatalog.description,
+            ServiceCatalog.default_price_cents, ServiceCatalog.active,
+        ))
+        return self._catalog_filter(q, active_only, needle).order_by(ServiceCatalog.name, ServiceCatalog.id)
+
+    def list_catalog(self, active_only: bool = True) -> list[ServiceCatalog]:
+        return list(self.s.scalars(self._catalog_query(active_only)))
+
+    # Paged access for the catalog tables: they fetch a page as the view scrolls
+    # instead of loading the whole catalog up front. Each whitespace-separated term
+    # of `needle` must appear in the name or description, case-insensitively.
+    def list_catalog_page(self, offset: int, limit: int, include_inactive: bool = True,
+                          needle: Optional[str] = None) -> list[ServiceCatalog]:
+        q = self._catalog_query(not include_inactive, needle).offset(int(offset)).limit(int(limit))
+        return list(self.s.scalars(q))
+
+    def count_catalog(self, include_inactive: bool = True, needle: Optional[str] = None) -> int:
+        q = self._catalog_filter(select(func.count(ServiceCatalog.id)), not include_inactive, needle)
+        return int(self.s.execute(q).scalar() or 0)
 
     def create_catalog_service(self, name: str, default_price_cents: int = 0) -> ServiceCatalog:
         row = ServiceCatalog(name=name.strip(), default_price_cents=int(default_price_cents), active=True)
         self.s.add(row)
-        self.s.commit()
-        self.s.refresh(row)
+        self._commit()
         return row
 
     def update_catalog_service(self, svc_id: int, **fields) -> ServiceCatalog:
@@ -103,7 +204,7 @@ class Repo:
             raise ValueError("ServiceCatalog not found")
         for k, v in fields.items():
             setattr(row, k, v)
-        self.s.commit()
+        self._commit()
         self.s.refresh(row)
         return row
 
@@ -112,18 +213,57 @@ class Repo:
         if not row:
             return False
         row.active = False
-        self.s.commit()
+        self._commit()
         return True
 
+    def bulk_upsert_catalog(self, creates: list[dict], updates: list[tuple[int, dict]],
+                            deletes: Iterable[int]) -> list[int]:
+        """
+        Apply a whole catalog edit session in one transaction: one executemany
+        INSERT ... RETURNING for new rows, one bulk UPDATE by primary key, one
+        DELETE ... IN. Returns the new ids in the order of `creates`.
+        Any failure rolls the whole batch back.
+        """
+        new_ids: list[int] = []
+        with self.transaction():
+            del_ids = [int(i) for i in deletes]
+            if del_ids:
+                self.s.execute(delete(ServiceCatalog).where(ServiceCatalog.id.in_(del_ids)),
+                               execution_options={"synchronize_session": False})
+            if updates:
+                self.s.execute(update(ServiceCatalog), [dict(f, id=int(i)) for i, f in updates])
+            if creates:
+                new_ids = list(self.s.scalars(
+                    insert(ServiceCatalog).returning(ServiceCatalog.id, sort_by_parameter_order=True),
+                    creates,
+                ))
+            self._commit()
+        return new_ids
+
     # ---------------- Customers ----------------
     def list_customers(self) -> list[Customer]:
-        return list(self.s.scalars(select(Customer).order_by(Customer.name)))
+        return list(self.s.scalars(
+            select(Customer).options(load_only(Customer.id, Customer.name, Customer.phone, Customer.email))
+            .order_by(Customer.name)
+        ))
+
+    # ---------------- Fast list rows (Core, no ORM hydration) ----------------
+    # Plain {id, name} mappings for list widgets that only show a label; avoids
+    # building/identity-mapping a full ORM instance per row.
+    def list_customer_rows(self) -> list:
+        return self.s.execute(
+            select(Customer.id, Customer.name).order_by(Customer.name)
+        ).mappings().all()
+
+    def list_site_rows_for_customer(self, customer_id: int) -> list:
+        return self.s.execute(
+            select(Site.id, Site.name).where(Site.customer_id == customer_id).order_by(Site.name)
+        ).mappings().all()
 
     def create_customer(self, **kwargs) -> Customer:
         c = Customer(**kwargs)
         self.s.add(c)
-        self.s.commit()
-        self.s.refresh(c)
+        self._commit()
         return c
 
     def update_customer(self, customer_id: int, **kwargs) -> Customer:
@@ -132,7 +272,7 @@ class Repo:
             raise ValueError("Customer not found")
         for k, v in kwargs.items():
             setattr(c, k, v)
-        self.s.commit()
+        self._commit()
         self.s.refresh(c)
         return c
 
@@ -141,13 +281,15 @@ class Repo:
         if not c:
             return False
         self.s.delete(c)
-        self.s.commit()
+        self._commit()
         return True
 
     # ---------------- Sites ----------------
     def list_sites_for_customer(self, customer_id: int) -> list[Site]:
         return list(self.s.scalars(
-            select(Site).where(Site.customer_id == customer_id).order_by(Site.name)
+            select(Site)
+            .options(load_only(Site.id, Site.customer_id, Site.name, Site.address, Site.cadence_text))
+            .where(Site.customer_id == customer_id).order_by(Site.name)
         ))
 
     def list_services_for_site(self, site_id: int) -> list[SiteService]:
@@ -168,22 +310,36 @@ class Repo:
         - If catalog_id is provided, pull name and default price from the catalog unless overridden.
         - If only name is provided, create a free-text service with price 0 or provided unit_price_cents.
         """
-        svc_name = (name or "").strip()
-        price = int(unit_price_cents or 0)
-        cat = None
-        if catalog_id:
-            cat = self.s.get(ServiceCatalog, int(catalog_id))
+        return self.add_services_to_site(site_id, [
+            dict(name=name, catalog_id=catalog_id, unit_price_cents=unit_price_cents)
+        ])[0]
+
+    def add_services_to_site(self, site_id: int, specs: list[dict]) -> list[SiteService]:
+        """
+        Bulk form of add_service_to_site; each spec takes the same name / catalog_id /
+        unit_price_cents keys. One catalog SELECT and one INSERT for the whole batch.
+        """
+        if not specs:
+            return []
+        cat_ids = {int(sp["catalog_id"]) for sp in specs if sp.get("catalog_id")}
+        cats = {c.id: c for c in self.s.scalars(
+            select(ServiceCatalog).where(ServiceCatalog.id.in_(cat_ids))
+        )} if cat_ids else {}
+        rows = []
+        for sp in specs:
+            svc_name = (sp.get("name") or "").strip()
+            price = sp.get("unit_price_cents")
+            cat = cats.get(int(sp["catalog_id"])) if sp.get("catalog_id") else None
             if cat:
                 if not svc_name:
                     svc_name = cat.name
-                if unit_price_cents is None:
-                    price = int(cat.default_price_cents or 0)
-        srow = SiteService(site_id=site_id, name=svc_name or "Service", catalog_id=(cat.id if cat else None),
-                           unit_price_cents=price, active=True)
-        self.s.add(srow)
-        self.s.commit()
-        self.s.refresh(srow)
-        return srow
+                if price is None:
+                    price = cat.default_price_cents
+            rows.append(dict(site_id=site_id, name=svc_name or "Service", catalog_id=(cat.id if cat else None),
+                             unit_price_cents=int(price or 0), active=True))
+        created = list(self.s.scalars(insert(SiteService).returning(SiteService), rows))
+        self._commit()
+        return created
 
     def update_site_service(self, service_id: int, **kwargs) -> SiteService:
         srow = self.s.get(SiteService, service_id)
@@ -191,32 +347,53 @@ class Repo:
             raise ValueError("SiteService not found")
         for k, v in kwargs.items():
             setattr(srow, k, v)
-        self.s.commit()
+        self._commit()
         self.s.refresh(srow)
         return srow
 
+    def sync_site_services(self, site_id: int, updates: list[tuple[int, dict]], inserts: list[dict],
+                           deletes: Iterable[int]) -> list[SiteService]:
+        """
+        Apply a SiteDialog services edit in one transaction: one DELETE ... IN,
+        one bulk UPDATE by primary key, one INSERT for new rows (inserts take
+        add_services_to_site specs). Deletes run first so a removed name can be
+        re-added. Returns the created rows; any failure rolls the batch back.
+        """
+        created: list[SiteService] = []
+        with self.transaction():
+            del_ids = [int(i) for i in deletes]
+            if del_ids:
+                self.s.execute(delete(SiteService).where(SiteService.id.in_(del_ids)),
+                               execution_options={"synchronize_session": False})
+            if updates:
+                self.s.execute(update(SiteService), [dict(f, id=int(i)) for i, f in updates])
+            created = self.add_services_to_site(site_id, inserts)
+            self._commit()
+        return created
+
     def delete_site_service(self, service_id: int):
         srow = self.s.get(SiteService, service_id)
         if not srow:
             return False
         self.s.delete(srow)
-        self.s.commit()
+        self._commit()
         return True
 
     def create_site(self, **kwargs) -> Site:
         # UI-only list of names from SiteDialog
         service_names = kwargs.pop("services_selected_names", None)
-        site = Site(**kwargs)
-        self.s.add(site)
-        self.s.commit()
-        self.s.refresh(site)
-
-        # Create contracted services if provided (legacy free-text, price 0)
-        if service_names:
-            names = {n.strip() for n in service_names if (n or "").strip()}
-            for nm in names:
-                self.s.add(SiteService(site_id=site.id, name=nm, unit_price_cents=0, active=True))
-            self.s.commit()
+        with self.transaction():
+            site = Site(**kwargs)
+            self.s.add(site)
+            self.s.flush()
+
+            # Create contracted services if provided (legacy free-text, price 0)
+            if service_names:
+                names = {n.strip() for n in service_names if (n or "").strip()}
+                if names:
+                    self.s.execute(insert(SiteService), [
+                        dict(site_id=site.id, name=nm, unit_price_cents=0, active=True) for nm in names
+                    ])
         return site
 
     def update_site(self, site_id: int, **kwargs) -> Site:
@@ -224,24 +401,23 @@ class Repo:
         s = self.s.get(Site, site_id)
         if not s:
             raise ValueError("Site not found")
-        for k, v in kwargs.items():
-            setattr(s, k, v)
-        self.s.commit()
-        self.s.refresh(s)
-
-        # Reconcile services if list was provided (legacy checklist, price stays as-is)
-        if service_names is not None:
-            want = {n.strip() for n in service_names if (n or "").strip()}
-            existing = {row.name.strip(): row for row in self.list_services_for_site(site_id)}
-            for nm in want:
-                if nm in existing:
-                    existing[nm].active = True
-                else:
-                    self.s.add(SiteService(site_id=site_id, name=nm, unit_price_cents=0, active=True))
-            for nm, row in existing.items():
-                if nm not in want:
-                    row.active = False
-            self.s.commit()
+        with self.transaction():
+            for k, v in kwargs.items():
+                setattr(s, k, v)
+
+            # Reconcile services if list was provided (legacy checklist, price stays as-is)
+            if service_names is not None:
+                want = {n.strip() for n in service_names if (n or "").strip()}
+                existing = {row.name.strip(): row for row in self.list_services_for_site(site_id)}
+                new_rows = [dict(site_id=site_id, name=nm, unit_price_cents=0, active=True)
+                            for nm in want if nm not in existing]
+                turn_on = [row.id for nm, row in existing.items() if nm in want and not row.active]
+                turn_off = [row.id for nm, row in existing.items() if nm not in want and row.active]
+                if new_rows:
+                    self.s.execute(insert(SiteService), new_rows)
+                for ids, flag in ((turn_on, True), (turn_off, False)):
+                    if ids:
+                        self.s.execute(update(SiteService).where(SiteService.id.in_(ids)).values(active=flag))
         return s
 
     def delete_site(self, site_id: int):
@@ -249,7 +425,7 @@ class Repo:
         if not s:
             return False
         self.s.delete(s)
-        self.s.commit()
+        self._commit()
         return True
 
     def get_site(self, site_id: int) -> Optional[Site]:
@@ -257,43 +433,57 @@ class Repo:
 
     # ---------------- Service Orders ----------------
     def list_sos_for_site(self, site_id: int) -> list[ServiceOrder]:
+        # the center SO table reads so.site and so.site.customer; nothing else
         return list(self.s.scalars(
-            select(ServiceOrder).where(ServiceOrder.site_id == site_id).order_by(ServiceOrder.scheduled_date)
+            select(ServiceOrder)
+            .options(*_hot_path(joinedload(ServiceOrder.site).joinedload(Site.customer)))
+            .where(ServiceOrder.site_id == site_id).order_by(ServiceOrder.scheduled_date)
         ))
 
-    def list_sos_due_in_month(self, year: int, month: int) -> list[ServiceOrder]:
+    def list_calendar_rows(self, year: int, month: int) -> list:
+        """
+        Month view rows as plain tuples (no ORM instances, no lazy loads):
+        id, title, scheduled_date, completed, invoiced, site_name, customer_name.
+        """
         start = date(year, month, 1)
         end = date(year + (month == 12), 1 if month == 12 else month + 1, 1)
-        return list(self.s.scalars(
-            select(ServiceOrder).where(
-                ServiceOrder.scheduled_date >= start,
-                ServiceOrder.scheduled_date < end
-            ).order_by(ServiceOrder.scheduled_date)
-        ))
+        return self.s.execute(
+            select(
+                ServiceOrder.id, ServiceOrder.title, ServiceOrder.scheduled_date,
+                ServiceOrder.completed, ServiceOrder.invoiced,
+                Site.name.label("site_name"), Customer.name.label("customer_name"),
+            )
+            .join(Site, Site.id == ServiceOrder.site_id)
+            .join(Customer, Customer.id == Site.customer_id)
+            .where(ServiceOrder.scheduled_date >= start, ServiceOrder.scheduled_date < end)
+            .order_by(ServiceOrder.scheduled_date)
+        ).all()
 
     def list_services_for_so(self, so_id: int) -> list[SOService]:
         return list(self.s.scalars(
-            select(SOService).where(SOService.service_order_id == so_id)
+            select(SOService).options(selectinload(SOService.site_service))
+            .where(SOService.service_order_id == so_id)
         ))
 
     def seed_services_for_so_from_site(self, so_id: int):
-        """Copy all active SiteService rows to SOService with price snapshots."""
+        """
+        Copy all active SiteService rows to SOService with price snapshots.
+        Existing links are bulk-deleted without session sync; don't keep SOService
+        objects for this SO across the call (they expire at commit).
+        """
         so = self.s.get(ServiceOrder, so_id)
         if not so:
             raise ValueError("ServiceOrder not found")
         site_services = self.list_services_for_site(so.site_id)
         # clear existing links first
-        self.s.query(SOService).filter(SOService.service_order_id == so_id).delete()
-        for srow in site_services:
-            if not srow.active:
-                continue
-            link = SOService(
-                service_order_id=so_id,
-                site_service_id=srow.id,
-                unit_price_cents=int(srow.unit_price_cents or 0),
-            )
-            self.s.add(link)
-        self.s.commit()
+        self.s.query(SOService).filter(SOService.service_order_id == so_id).delete(synchronize_session=False)
+        payload = [
+            dict(service_order_id=so_id, site_service_id=srow.id, unit_price_cents=int(srow.unit_price_cents or 0))
+            for srow in site_services if srow.active
+        ]
+        if payload:
+            self.s.execute(insert(SOService), payload)
+        self._commit()
 
     def add_service_to_so(self, so_id: int, site_service_id: int) -> SOService:
         srow = self.s.get(SiteService, int(site_service_id))
@@ -303,27 +493,34 @@ class Repo:
             unit_price_cents=int(getattr(srow, "unit_price_cents", 0) or 0),
         )
         self.s.add(link)
-        self.s.commit()
-        self.s.refresh(link)
+        self._commit()
         return link
 
     def set_services_for_so(self, so_id: int, service_ids: list[int]):
-        self.s.query(SOService).filter(SOService.service_order_id == so_id).delete()
-        for sid in service_ids:
-            self.add_service_to_so(so_id, int(sid))
-        self.s.commit()
+        # same bulk-delete caveat as seed_services_for_so_from_site
+        ids = list(dict.fromkeys(int(sid) for sid in service_ids))
+        prices = dict(self.s.execute(
+            select(SiteService.id, SiteService.unit_price_cents).where(SiteService.id.in_(ids))
+        ).all()) if ids else {}
+        self.s.query(SOService).filter(SOService.service_order_id == so_id).delete(synchronize_session=False)
+        if ids:
+            self.s.execute(insert(SOService), [
+                dict(service_order_id=so_id, site_service_id=sid, unit_price_cents=int(prices.get(sid) or 0))
+                for sid in ids
+            ])
+        self._commit()
 
     def create_so(self, **kwargs) -> ServiceOrder:
         service_ids = kwargs.pop("services_selected_ids", None)
-        so = ServiceOrder(**kwargs)
-        self.s.add(so)
-        self.s.commit()
-        self.s.refresh(so)
-        if service_ids:
-            self.set_services_for_so(so.id, [int(x) for x in service_ids])
-        else:
-            # seed from site's contracted services
-            self.seed_services_for_so_from_site(so.id)
+        with self.transaction():
+            so = ServiceOrder(**kwargs)
+            self.s.add(so)
+            self.s.flush()
+            if service_ids:
+                self.set_services_for_so(so.id, [int(x) for x in service_ids])
+            else:
+                # seed from site's contracted services
+                self.seed_services_for_so_from_site(so.id)
         return so
 
     def update_so(self, so_id: int, **kwargs) -> ServiceOrder:
@@ -331,12 +528,11 @@ class Repo:
         so = self.s.get(ServiceOrder, so_id)
         if not so:
             raise ValueError("ServiceOrder not found")
-        for k, v in kwargs.items():
-            setattr(so, k, v)
-        self.s.commit()
-        self.s.refresh(so)
-        if service_ids is not None:
-            self.set_services_for_so(so_id, [int(x) for x in service_ids])
+        with self.transaction():
+            for k, v in kwargs.items():
+                setattr(so, k, v)
+            if service_ids is not None:
+                self.set_services_for_so(so_id, [int(x) for x in service_ids])
         return so
 
     def delete_so(self, so_id: int):
@@ -344,88 +540,119 @@ class Repo:
         if not so:
             return False
         self.s.delete(so)
-        self.s.commit()
+        self._commit()
         return True
 
     # ------------- cadence-aware helpers -------------
     def last_scheduled_for_site(self, site_id: int) -> Optional[date]:
-        stmt = select(func.max(ServiceOrder.scheduled_date)).where(
+        # newest first + LIMIT 1: one backward seek on ix_so_site_sched (site_id, scheduled_date)
+        stmt = select(ServiceOrder.scheduled_date).where(
             ServiceOrder.site_id == site_id,
             ServiceOrder.scheduled_date.is_not(None)
-        )
-        return self.s.execute(stmt).scalar_one_or_none()
+        ).order_by(ServiceOrder.scheduled_date.desc()).limit(1)
+        return self.s.execute(stmt).scalar()
+
+    def _site_with_last_scheduled(self, site_id: int) -> Tuple[Optional[Site], Optional[date]]:
+        """Site and its latest scheduled SO date in one roundtrip."""
+        row = self.s.execute(
+            select(Site, func.max(ServiceOrder.scheduled_date))
+            .outerjoin(ServiceOrder, ServiceOrder.site_id == Site.id)
+            .where(Site.id == site_id)
+            .group_by(Site.id)
+        ).first()
+        return (row[0], row[1]) if row else (None, None)
 
     def next_due_for_site(self, site_id: int) -> Optional[date]:
-        site = self.get_site(site_id)
+        site, last = self._site_with_last_scheduled(site_id)
         if not site:
             return None
-        code = site.cadence_text or ""
-        base = self.last_scheduled_for_site(site_id) or date.today()
-        return _next_due_from_cadence(code, base)
+        return _next_due_from_cadence(site.cadence_text or "", last or date.today())
 
     def create_next_so_for_site(self, site_id: int) -> ServiceOrder:
-        site = self.get_site(site_id)
+        site, last = self._site_with_last_scheduled(site_id)
         if not site:
             raise ValueError("Site not found")
         code = site.cadence_text or ""
-        title = _title_from_cadence(code)
-        scheduled = self.next_due_for_site(site_id) or date.today()
         so = ServiceOrder(
             site_id=site_id,
-            title=title,
+            title=_title_from_cadence(code),
             description="",
-            scheduled_date=scheduled,
+            scheduled_date=_next_due_from_cadence(code, last or date.today()),
             completed=False,
             invoiced=False,
             notes=""
         )
-        self.s.add(so)
-        self.s.commit()
-        self.s.refresh(so)
-        # seed services + prices
-        self.seed_services_for_so_from_site(so.id)
+        with self.transaction():
+            self.s.add(so)
+            self.s.flush()
+            # seed services + prices (a brand-new SO has no links to clear)
+            payload = [
+                dict(service_order_id=so.id, site_service_id=srow.id, unit_price_cents=int(srow.unit_price_cents or 0))
+                for srow in self.list_services_for_site(site_id) if srow.active
+            ]
+            if payload:
+                self.s.execute(insert(SOService), payload)
         return so
 
     # ---------------- Attachments ----------------
     def add_attachment(self, entity_type: str, entity_id: int, file_path: str, note: str = "") -> Attachment:
         a = Attachment(entity_type=entity_type, entity_id=entity_id, file_path=file_path, note=note)
         self.s.add(a)
-        self.s.commit()
-        self.s.refresh(a)
+        self._commit()
         return a
 
     # ---------------- Payment Profiles ----------------
     def list_payment_profiles(self, customer_id: int) -> list[PaymentProfile]:
         return list(self.s.scalars(
-            select(PaymentProfile).where(PaymentProfile.customer_id == customer_id).order_by(PaymentProfile.id)
+            select(PaymentProfile)
+            .options(load_only(PaymentProfile.id, PaymentProfile.customer_id, PaymentProfile.method,
+                               PaymentProfile.details_json, PaymentProfile.is_default))
+            .where(PaymentProfile.customer_id == customer_id).order_by(PaymentProfile.id)
         ))
 
     def create_payment_profile(self, **kwargs) -> PaymentProfile:
         p = PaymentProfile(**kwargs)
         self.s.add(p)
-        self.s.commit()
-        self.s.refresh(p)
+        self._commit()
         return p
 
     def set_default_payment_profile(self, customer_id: int, profile_id: int):
-        self.s.query(PaymentProfile).filter(PaymentProfile.customer_id == customer_id).update({"is_default": False})
-        p = self.s.get(PaymentProfile, profile_id)
-        if p:
-            p.is_default = True
-        self.s.commit()
+        # one statement flips every profile of the customer; no window with zero defaults
+        self.s.execute(
+            update(PaymentProfile)
+            .where(PaymentProfile.customer_id == customer_id)
+            .values(is_default=case((PaymentProfile.id == profile_id, True), else_=False))
+        )
+        self._commit()
 
     # ---------------- Employees ----------------
-    def list_employees(self, active_only: bool = True) -> list[Employee]:
-        q = select(Employee)
+    def list_employees(self, active_only: bool = True, search: Optional[str] = None,
+                       limit: Optional[int] = None, offset: int = 0) -> list[Employee]:
+        """Each whitespace-separated term of `search` must appear (case-insensitively)
+        in the name, role, phone or email; matched in SQL like the catalog search.
+        `limit`/`offset` page through the name-ordered result."""
+        q = select(Employee).options(load_only(
+            Employee.id, Employee.name, Employee.role, Employee.phone, Employee.email, Employee.active,
+        ))
         if active_only:
             q = q.where(Employee.active == True)
-        return list(self.s.scalars(q.order_by(Employee.name)))
+        for t in (search or "").lower().split():
+            q = q.where(or_(*(
+                func.lower(func.coalesce(col, "")).contains(t, autoescape=True)
+                for col in (Employee.name, Employee.role, Employee.phone, Employee.email)
+            )))
+        q = q.order_by(Employee.name, Employee.id)
+        if limit is not None:
+            q = q.offset(int(offset)).limit(int(limit))
+        return list(self.s.scalars(q))
+
+    def get_employee(self, emp_id: int) -> Optional[Employee]:
+        return self.s.get(Employee, emp_id)
 
     def create_employee(self, **kwargs) -> Employee:
         e = Employee(**kwargs)
         self.s.add(e)
-        self.s.commit()
-        self.s.refresh(e)
+        self._commit()
         return e
 
     def update_employee(self, emp_id: int, **kwargs) -> Employee:
@@ -434,7 +661,7 @@ class Repo:
             raise ValueError("Employee not found")
         for k, v in kwargs.items():
             setattr(e, k, v)
-        self.s.commit()
+        self._commit()
         self.s.refresh(e)
         return e
 
@@ -443,7 +670,7 @@ class Repo:
         if not e:
             return False
         self.s.delete(e)
-        self.s.commit()
+        self._commit()
         return True
 
     # ---------------- Staff Assignments ----------------
@@ -457,18 +684,28 @@ class Repo:
         """
         Idempotently assign an employee to an SO.
         Extra kwargs (like role=) are accepted and ignored for forward-compat.
+        One INSERT ... ON CONFLICT DO NOTHING on uq_so_employee; the existing row
+        is only SELECTed when the pair was already assigned.
         """
-        existing = (
-            self.s.query(SOAssignment)
-            .filter_by(service_order_id=int(so_id), employee_id=int(employee_id))
-            .first()
+        key = dict(service_order_id=int(so_id), employee_id=int(employee_id))
+        dialect_insert = _UPSERT_INSERTS.get(self.s.get_bind().dialect.name)
+        if dialect_insert is None:
+            existing = self.s.query(SOAssignment).filter_by(**key).first()
+            if existing:
+                return existing
+            obj = SOAssignment(**key)
+            self.s.add(obj)
+            self._commit()
+            return obj
+        stmt = (
+            dialect_insert(SOAssignment).values(**key)
+            .on_conflict_do_nothing(index_elements=["service_order_id", "employee_id"])
+            .returning(SOAssignment)
         )
-        if existing:
-            return existing
-        obj = SOAssignment(service_order_id=int(so_id), employee_id=int(employee_id))
-        self.s.add(obj)
-        self.s.commit()
-        self.s.refresh(obj)
+        obj = self.s.scalars(stmt).first()
+        self._commit()
+        if obj is None:
+            obj = self.s.query(SOAssignment).filter_by(**key).one()
         return obj
 
     def unassign_employee(self, so_id: int, employee_id: int) -> bool:
@@ -481,16 +718,74 @@ class Repo:
         if not obj:
             return False
         self.s.delete(obj)
-        self.s.commit()
+        self._commit()
         return True
 
+    def sync_assignments(self, so_id: int, employee_ids: Iterable[int]) -> tuple[int, int]:
+        """
+        Make the SO's staff exactly `employee_ids` in one transaction: one SELECT of
+        the current ids, one DELETE ... IN for the dropped ones, one multi-row
+        INSERT for the new ones. Returns (removed, added); any failure rolls the batch back.
+        """
+        so_id = int(so_id)
+        wanted = {int(i) for i in employee_ids}
+        with self.transaction():
+            current = set(self.s.scalars(
+                select(SOAssignment.employee_id).where(SOAssignment.service_order_id == so_id)
+            ))
+            to_remove, to_add = current - wanted, wanted - current
+            if to_remove:
+                self.s.execute(
+                    delete(SOAssignment).where(
+                        SOAssignment.service_order_id == so_id,
+                        SOAssignment.employee_id.in_(to_remove),
+                    ),
+                    execution_options={"synchronize_session": False},
+                )
+            if to_add:
+                # one multi-row INSERT; ON CONFLICT DO NOTHING (as in assign_employee)
+                # keeps a pair assigned meanwhile from failing the whole batch
+                rows = [dict(service_order_id=so_id, employee_id=i) for i in sorted(to_add)]
+                dialect_insert = _UPSERT_INSERTS.get(self.s.get_bind().dialect.name)
+                if dialect_insert is None:
+                    self.s.execute(insert(SOAssignment), rows)
+                else:
+                    self.s.execute(
+                        dialect_insert(SOAssignment).values(rows)
+                        .on_conflict_do_nothing(index_elements=["service_order_id", "employee_id"])
+                    )
+            self._commit()
+        return len(to_remove), len(to_add)
+
     # ---------------- Invoice seeding ----------------
     def _seed_invoice_no(self, so_id: int, so_date: Optional[date]) -> str:
         d = (so_date or date.today()).strftime("%Y%m%d")
         return f"FPC-{d}-SO{so_id}"
 
+    def _load_so_for_invoice(self, so_id: int) -> Optional[ServiceOrder]:
+        """
+        SO with site and customer joined in (one query).
+        Those are the only relationships invoice seeding may touch; lines come from _invoice_lines.
+        """
+        stmt = (
+            select(ServiceOrder)
+            .options(*_hot_path(joinedload(ServiceOrder.site).joinedload(Site.customer)))
+            .where(ServiceOrder.id == so_id)
+        )
+        return self.s.execute(stmt).scalar_one_or_none()
+
+    def _invoice_lines(self, so_id: int) -> list:
+        """(name, unit_price_cents) per SO line as plain rows; no ORM instances."""
+        return self.s.execute(
+            select(SiteService.name, SOService.unit_price_cents)
+            .select_from(SOService)
+            .outerjoin(SiteService, SiteService.id == SOService.site_service_id)
+            .where(SOService.service_order_id == so_id)
+            .order_by(SOService.id)
+        ).all()
+
     def invoice_seed_for_so(self, so_id: int, *, terms_days: int = 14) -> dict:
-        so = self.s.get(ServiceOrder, so_id)
+        so = self._load_so_for_invoice(so_id)
         if not so:
             raise ValueError("ServiceOrder not found")
         site = so.site
@@ -507,14 +802,11 @@ class Repo:
             bill_contact = bill_phone
 
         # priced lines from SO snapshot
-        links = self.list_services_for_so(so_id)
-        line_items_cents: list[tuple[str, int]] = []
-        for lk in links:
-            nm = lk.site_service.name if lk.site_service else "Service"
-            amt = int(getattr(lk, "unit_price_cents", 0) or 0)
-            line_items_cents.append((nm, amt))
-
-        subtotal_cents = sum(a for _, a in line_items_cents)
+        # unit_price_cents is NOT NULL INTEGER, so the row values are used as-is
+        line_items_cents: list[tuple[str, int]] = [
+            (name if name is not None else "Service", cents) for name, cents in self._invoice_lines(so.id)
+        ]
+        subtotal_cents = sum(cents for _, cents in line_items_cents)
 
         return dict(
             invoice_no=self._seed_invoice_no(so.id, so.scheduled_date),
@@ -1,46 +1,54 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-from typing import Any, List, Optional
-from dataclasses import dataclass
+import functools
+from typing import Any, Callable, List, Optional, Tuple
+from dataclasses import dataclass, field
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QTimer
 from PySide6.QtWidgets import (
-    QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QTableWidget,
-    QTableWidgetItem, QAbstractItemView, QHeaderView, QCheckBox, QDoubleSpinBox,
-    QMessageBox, QFrame
+    QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QTableView,
+    QAbstractItemView, QHeaderView, QMessageBox, QFrame
 )
 
+from .dialogs.common import _RIGHTV, _get_repo, _to_cents, _to_dollars
+from .widgets import PriceDelegate
+
 # -------------------------------
 # Data model for table rows
 # -------------------------------
-@dataclass
+@dataclass(slots=True)  # no per-row __dict__; rows are never given extra attributes
 class _CatRow:
     id: Optional[int]
     name: str
     description: str
     default_price_cents: int
     active: bool
+    # lowercased "name\x1fdescription" for the search filter (one substring scan per
+    # term); refreshed whenever name/description change. \x1f can't be typed into a term.
+    haystack: str = field(default="", init=False, repr=False, compare=False)
 
-def _to_dollars(cents: int) -> float:
-    return float(cents or 0) / 100.0
+    def __post_init__(self):
+        self.relower()
 
-def _to_cents(dollars: float) -> int:
-    return int(round(float(dollars or 0.0) * 100))
+    def relower(self):
+        self.haystack = f"{self.name}\x1f{self.description}".lower()
 
 
 # -------------------------------
 # Repo helpers with safe fallbacks
 # -------------------------------
-def _repo_has(obj: Any, *names: str) -> Optional[str]:
+@functools.lru_cache(maxsize=None)
+def _resolve(repo_cls: type, names: Tuple[str, ...]) -> Optional[str]:
+    """First of `names` the repo class provides; resolved once per (class, names)."""
     for n in names:
-        if hasattr(obj, n):
+        if hasattr(repo_cls, n):
             return n
     return None
 
 def _repo_list(repo: Any, *, include_inactive: bool = True) -> List[Any]:
     # Preferred: repo method
-    fn = _repo_has(repo, "list_catalog")
+    fn = _resolve(type(repo), ("list_catalog",))
     if fn:
         try:
             return getattr(repo, fn)(active_only=not include_inactive)
@@ -57,8 +65,21 @@ def _repo_list(repo: Any, *, include_inactive: bool = True) -> List[Any]:
     except Exception as e:
         raise RuntimeError(f"Cannot load catalog: {e}")
 
+def _repo_page(repo: Any, offset: int, limit: int, *, include_inactive: bool = True) -> List[Any]:
+    fn = _resolve(type(repo), ("list_catalog_page",))
+    if fn:
+        return getattr(repo, fn)(offset, limit, include_inactive=include_inactive)
+    # Fallback: slice the full list
+    return _repo_list(repo, include_inactive=include_inactive)[offset:offset + limit]
+
+def _repo_count(repo: Any, *, include_inactive: bool = True) -> int:
+    fn = _resolve(type(repo), ("count_catalog",))
+    if fn:
+        return int(getattr(repo, fn)(include_inactive=include_inactive))
+    return len(_repo_list(repo, include_inactive=include_inactive))
+
 def _repo_create(repo: Any, **kw) -> Any:
-    fn = _repo_has(repo, "create_catalog_item", "create_catalog", "add_catalog_item")
+    fn = _resolve(type(repo), ("create_catalog_item", "create_catalog", "add_catalog_item"))
     if fn:
         return getattr(repo, fn)(**kw)
     # Fallback: direct insert
@@ -76,7 +97,7 @@ def _repo_create(repo: Any, **kw) -> Any:
     return obj
 
 def _repo_update(repo: Any, item_id: int, **kw) -> Any:
-    fn = _repo_has(repo, "update_catalog_item", "update_catalog")
+    fn = _resolve(type(repo), ("update_catalog_item", "update_catalog"))
     if fn:
         return getattr(repo, fn)(item_id, **kw)
     # Fallback: direct update
@@ -93,7 +114,7 @@ def _repo_update(repo: Any, item_id: int, **kw) -> Any:
     return obj
 
 def _repo_delete(repo: Any, item_id: int) -> Any:
-    fn = _repo_has(repo, "delete_catalog_item", "delete_catalog")
+    fn = _resolve(type(repo), ("delete_catalog_item", "delete_catalog"))
     if fn:
         return getattr(repo, fn)(item_id)
     # Fallback: direct delete
@@ -105,6 +126,199 @@ def _repo_delete(repo: Any, item_id: int) -> Any:
         s.commit()
     return None
 
+def _repo_bulk_save(repo: Any, creates: List[dict], updates: List[Tuple[int, dict]],
+                    deletes: List[int]) -> List[int]:
+    """Apply the whole edit session at once; returns new ids in `creates` order."""
+    fn = _resolve(type(repo), ("bulk_upsert_catalog",))
+    if fn:
+        return list(getattr(repo, fn)(creates, updates, deletes))
+    # Fallback: per-row helpers
+    for did in deletes:
+        _repo_delete(repo, did)
+    for item_id, kw in updates:
+        _repo_update(repo, item_id, **kw)
+    return [getattr(_repo_create(repo, **kw), "id", None) for kw in creates]
+
+
+# -------------------------------
+# Table model over the row buffer
+# -------------------------------
+class CatRowModel(QAbstractTableModel):
+    """
+    Editable model over a list of _CatRow. The view only asks for visible cells,
+    so no per-row widgets exist: price edits use PriceDelegate, Active is a check state.
+
+    With set_source() the DB rows are paged in PAGE_SIZE at a time through Qt's
+    canFetchMore/fetchMore as the view scrolls; rows added in the dialog sit after them.
+    """
+    HEADERS = ["Name", "Description", "Default Rate", "Active"]
+    PAGE_SIZE = 200
+
+    def __init__(self, rows: Optional[List[_CatRow]] = None, parent=None):
+        super().__init__(parent)
+        self.rows: List[_CatRow] = rows if rows is not None else []
+        self._fetch_page: Optional[Callable[[int, int], List[_CatRow]]] = None
+        self._total = 0      # DB rows available
+        self._fetched = 0    # DB rows paged in so far (next offset)
+        self._db_rows = len(self.rows)  # rows[:_db_rows] came from the DB
+        self._id_index: Optional[dict[int, int]] = None  # id -> row; rebuilt lazily after row moves
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        base = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        if index.column() == 3:
+            return base | Qt.ItemIsUserCheckable
+        return base | Qt.ItemIsEditable
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        r = self.rows[index.row()]
+        col = index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if col == 0:
+                return r.name
+            if col == 1:
+                return r.description
+            if col == 2:
+                dollars = _to_dollars(r.default_price_cents)
+                return dollars if role == Qt.EditRole else f"{dollars:.2f}"
+            return None
+        if role == Qt.CheckStateRole and col == 3:
+            return Qt.Checked if r.active else Qt.Unchecked
+        if role == Qt.TextAlignmentRole and col == 2:
+            return _RIGHTV
+        if role == Qt.UserRole and col == 0:
+            return r.id
+        return None
+
+    def setData(self, index: QModelIndex, value, role=Qt.EditRole):
+        if not index.isValid():
+            return False
+        r = self.rows[index.row()]
+        col = index.column()
+        if role == Qt.EditRole and col == 0:
+            r.name = str(value or "")
+            r.relower()
+        elif role == Qt.EditRole and col == 1:
+            r.description = str(value or "")
+            r.relower()
+        elif role == Qt.EditRole and col == 2:
+            r.default_price_cents = _to_cents(value)
+        elif role == Qt.CheckStateRole and col == 3:
+            r.active = Qt.CheckState(value) == Qt.Checked
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    # ---- paging ----
+    def set_source(self, fetch_page: Callable[[int, int], List[_CatRow]], total: int):
+        self.beginResetModel()
+        self.rows = []
+        self._fetch_page, self._total, self._fetched, self._db_rows = fetch_page, int(total), 0, 0
+        self._id_index = None
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetch_page is not None and self._fetched < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        page = self._fetch_page(self._fetched, self.PAGE_SIZE)
+        if not page:
+            self._total = self._fetched  # catalog shrank since the count
+            return
+        self._fetched += len(page)
+        at = self._db_rows
+        self.beginInsertRows(QModelIndex(), at, at + len(page) - 1)
+        self.rows[at:at] = page
+        self._db_rows += len(page)
+        self._id_index = None
+        self.endInsertRows()
+
+    def fetch_all(self):
+        while self.canFetchMore():
+            self.fetchMore()
+
+    # ---- row buffer helpers ----
+    def set_rows(self, rows: List[_CatRow]):
+        self.beginResetModel()
+        self.rows = rows
+        self._fetch_page, self._db_rows = None, len(rows)
+        self._id_index = None
+        self.endResetModel()
+
+    def append_row(self, r: _CatRow) -> int:
+        at = len(self.rows)
+        self.beginInsertRows(QModelIndex(), at, at)
+        self.rows.append(r)
+        self.endInsertRows()
+        return at
+
+    def remove_row(self, at: int) -> _CatRow:
+        self.beginRemoveRows(QModelIndex(), at, at)
+        r = self.rows.pop(at)
+        if at < self._db_rows:
+            self._db_rows -= 1
+        self._id_index = None
+        self.endRemoveRows()
+        return r
+
+    def row_for_id(self, item_id: int) -> Optional[int]:
+        """Model row holding catalog id `item_id` among the loaded rows, or None."""
+        if self._id_index is None:
+            self._id_index = {r.id: i for i, r in enumerate(self.rows) if r.id is not None}
+        return self._id_index.get(item_id)
+
+    def mark_saved(self, saved: List[_CatRow]):
+        """
+        Adopt the values just written (new ids, stripped text) in place of a reload;
+        `saved` lines up with `rows`. Every row is a DB row afterwards.
+        """
+        if not saved:
+            return
+        for r, s in zip(self.rows, saved):
+            r.id, r.name, r.description = s.id, s.name, s.description
+            r.relower()
+        n = len(self.rows)
+        self._db_rows = self._fetched = self._total = n
+        self._id_index = None
+        self.dataChanged.emit(self.index(0, 0), self.index(n - 1, len(self.HEADERS) - 1))
+
+
+class CatFilterProxy(QSortFilterProxyModel):
+    """
+    Search filter over CatRowModel: reads the row buffer directly, no per-cell data() calls.
+    Every whitespace-separated term must appear in the name or the description.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._terms: Tuple[str, ...] = ()
+
+    def set_needle(self, needle: str):
+        self._terms = tuple(needle.lower().split())
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self._terms:
+            return True
+        hay = self.sourceModel().rows[source_row].haystack
+        return all(t in hay for t in self._terms)
+
 
 # ==========================================================
 # Catalog Manager Dialog
@@ -117,16 +331,22 @@ class CatalogManagerDialog(QDialog):
     Double-click or press F2 on Name/Description to edit.
     Uses repo helpers when available, falls back to direct DB updates.
     """
+    _STYLE = """
+        QDialog { background: #fafafa; }
+        QLineEdit { padding: 6px; }
+        QPushButton { padding: 6px 10px; }
+        QTableView { gridline-color: #dddddd; }
+    """
+
     def __init__(self, session_or_repo: Any, parent: QWidget | None = None):
         super().__init__(parent)
         self.setWindowTitle("Catalog Manager")
         self.setMinimumWidth(700)
 
         # Repo instance: prefer parent's repo if present
-        self.repo = getattr(parent, "repo", session_or_repo)
+        self.repo = _get_repo(parent, session_or_repo)
 
         self._deleted_ids: set[int] = set()
-        self._rows_cache: List[_CatRow] = []
 
         root = QVBoxLayout(self)
 
@@ -148,8 +368,12 @@ class CatalogManagerDialog(QDialog):
         root.addWidget(sep)
 
         # Table
-        self.tbl = QTableWidget(0, 4)
-        self.tbl.setHorizontalHeaderLabels(["Name", "Description", "Default Rate", "Active"])
+        self.model = CatRowModel([], self)
+        self.proxy = CatFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.tbl = QTableView()
+        self.tbl.setModel(self.proxy)
+        self.tbl.setItemDelegateForColumn(2, PriceDelegate(self.tbl))
         hh = self.tbl.horizontalHeader()
         hh.setSectionResizeMode(0, QHeaderView.Stretch)
         hh.setSectionResizeMode(1, QHeaderView.Stretch)
@@ -176,12 +400,7 @@ class CatalogManagerDialog(QDialog):
         root.addLayout(btm)
 
         # Style
-        self.setStyleSheet("""
-            QDialog { background: #fafafa; }
-            QLineEdit { padding: 6px; }
-            QPushButton { padding: 6px 10px; }
-            QTableWidget { gridline-color: #dddddd; }
-        """)
+        self.setStyleSheet(self._STYLE)
 
         # Signals
         self.btn_add.clicked.connect(self._add_row)
@@ -189,113 +408,86 @@ class CatalogManagerDialog(QDialog):
         self.btn_del.clicked.connect(self._delete_row)
         self.btn_save.clicked.connect(self._save_all)
         self.btn_close.clicked.connect(self.accept)
-        self.search.textChanged.connect(self._apply_filter)
+        # debounce: a burst of keystrokes re-filters once
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        self.search.textChanged.connect(self._filter_timer.start)
 
         self._load()
         self.tbl.setToolTip("Double-click Name or Description to edit. F2 also edits.")
 
     # ---------- load/build ----------
     def _load(self):
-        self.tbl.setRowCount(0)
-        self._rows_cache.clear()
         try:
-            rows = _repo_list(self.repo, include_inactive=True)
+            total = _repo_count(self.repo, include_inactive=True)
         except Exception as e:
             QMessageBox.warning(self, "Catalog", f"Could not load catalog:\n{e}")
-            rows = []
-
-        for c in rows:
-            self._rows_cache.append(_CatRow(
-                id=getattr(c, "id", None),
-                name=getattr(c, "name", "") or "",
-                description=getattr(c, "description", "") or "",
-                default_price_cents=int(getattr(c, "default_price_cents", 0) or 0),
-                active=bool(getattr(c, "active", True)),
-            ))
-
-        for r in self._rows_cache:
-            self._insert_table_row(r)
-
+            total = 0
+        self.model.set_source(self._fetch_page, total)
+        self.model.fetchMore()  # first page now; the view pulls the rest as it scrolls
         self._apply_filter()
 
-    def _insert_table_row(self, r: _CatRow):
-        row = self.tbl.rowCount()
-        self.tbl.insertRow(row)
-
-        it_name = QTableWidgetItem(r.name)
-        it_name.setData(Qt.UserRole, r.id)
-        it_name.setFlags((it_name.flags() | Qt.ItemIsEditable) & ~Qt.ItemIsDropEnabled)
-        self.tbl.setItem(row, 0, it_name)
-
-        it_desc = QTableWidgetItem(r.description)
-        it_desc.setFlags((it_desc.flags() | Qt.ItemIsEditable) & ~Qt.ItemIsDropEnabled)
-        self.tbl.setItem(row, 1, it_desc)
-
-        spn = QDoubleSpinBox()
-        spn.setRange(0.0, 999999.0)
-        spn.setDecimals(2)
-        spn.setSingleStep(1.00)
-        spn.setValue(_to_dollars(r.default_price_cents))
-        self.tbl.setCellWidget(row, 2, spn)
+    def _fetch_page(self, offset: int, limit: int) -> List[_CatRow]:
+        try:
+            rows = _repo_page(self.repo, offset, limit, include_inactive=True)
+        except Exception as e:
+            QMessageBox.warning(self, "Catalog", f"Could not load catalog:\n{e}")
+            return []
+        return [_CatRow(
+            id=getattr(c, "id", None),
+            name=getattr(c, "name", "") or "",
+            description=getattr(c, "description", "") or "",
+            default_price_cents=int(getattr(c, "default_price_cents", 0) or 0),
+            active=bool(getattr(c, "active", True)),
+        ) for c in rows]
+
+    def _selected_row(self) -> Optional[int]:
+        idxs = self.tbl.selectionModel().selectedRows()
+        return self.proxy.mapToSource(idxs[0]).row() if idxs else None
 
-        chk = QCheckBox()
-        chk.setChecked(r.active)
-        chk.setTristate(False)
-        chk.setStyleSheet("margin-left: 8px;")
-        self.tbl.setCellWidget(row, 3, chk)
+    def _select_id(self, item_id: int):
+        row = self.model.row_for_id(item_id)
+        if row is None:
+            return
+        pidx = self.proxy.mapFromSource(self.model.index(row, 0))
+        if pidx.isValid():
+            self.tbl.selectRow(pidx.row())
 
     # ---------- actions ----------
     def _add_row(self):
-        self._insert_table_row(_CatRow(None, "New service", "", 0, True))
+        self.model.append_row(_CatRow(None, "New service", "", 0, True))
 
     def _duplicate_row(self):
-        idxs = self.tbl.selectionModel().selectedRows()
-        if not idxs:
+        row = self._selected_row()
+        if row is None:
             QMessageBox.information(self, "Duplicate", "Select a row to duplicate.")
             return
-        row = idxs[0].row()
-        it_name = self.tbl.item(row, 0)
-        it_desc = self.tbl.item(row, 1)
-        spn: QDoubleSpinBox = self.tbl.cellWidget(row, 2)
-        chk: QCheckBox = self.tbl.cellWidget(row, 3)
-        self._insert_table_row(_CatRow(
+        src = self.model.rows[row]
+        self.model.append_row(_CatRow(
             None,
-            (it_name.text() if it_name else "") + " (copy)",
-            it_desc.text() if it_desc else "",
-            _to_cents(spn.value()) if spn else 0,
-            bool(chk.isChecked()) if chk else True
+            src.name + " (copy)",
+            src.description,
+            src.default_price_cents,
+            src.active,
         ))
 
     def _delete_row(self):
-        idxs = self.tbl.selectionModel().selectedRows()
-        if not idxs:
+        row = self._selected_row()
+        if row is None:
             QMessageBox.information(self, "Delete", "Select a row to delete.")
             return
-        row = idxs[0].row()
-        it_name = self.tbl.item(row, 0)
-        item_id = it_name.data(Qt.UserRole) if it_name else None
-        if item_id:
-            self._deleted_ids.add(int(item_id))
-        self.tbl.removeRow(row)
+        r = self.model.remove_row(row)
+        if r.id:
+            self._deleted_ids.add(int(r.id))
 
     # ---------- save ----------
     def _collect_rows(self) -> List[_CatRow]:
-        rows: List[_CatRow] = []
-        for r in range(self.tbl.rowCount()):
-            it_name = self.tbl.item(r, 0)
-            it_desc = self.tbl.item(r, 1)
-            spn: QDoubleSpinBox = self.tbl.cellWidget(r, 2)
-            chk: QCheckBox = self.tbl.cellWidget(r, 3)
-
-            cid = it_name.data(Qt.UserRole) if it_name else None
-            nm = (it_name.text() if it_name else "").strip()
-            ds = (it_desc.text() if it_desc else "").strip()
-            pr = _to_cents(spn.value() if spn else 0.0)
-            ac = bool(chk.isChecked()) if chk else True
-            rows.append(_CatRow(id=int(cid) if cid is not None else None,
-                                name=nm, description=ds,
-                                default_price_cents=pr, active=ac))
-        return rows
+        return [_CatRow(id=int(r.id) if r.id is not None else None,
+                        name=r.name.strip(), description=r.description.strip(),
+                        default_price_cents=r.default_price_cents, active=r.active)
+                for r in self.model.rows]
 
     def _save_all(self):
         rows = self._collect_rows()
@@ -305,49 +497,47 @@ class CatalogManagerDialog(QDialog):
                 QMessageBox.warning(self, "Missing", "Every item needs a Name.")
                 return
 
-        # Deletes
-        for did in list(self._deleted_ids):
-            try:
-                _repo_delete(self.repo, did)
-            except Exception as e:
-                QMessageBox.warning(self, "Delete", f"Could not delete id {did}:\n{e}")
+        # One batch: deletes, updates and creates land (or roll back) together
+        creates: List[dict] = []
+        updates: List[Tuple[int, dict]] = []
+        created_at: List[int] = []  # model row of each entry in `creates`
+        for i, r in enumerate(rows):
+            fields = dict(
+                name=r.name,
+                description=r.description,
+                default_price_cents=r.default_price_cents,
+                active=r.active,
+            )
+            if r.id is None:
+                creates.append(fields)
+                created_at.append(i)
             else:
-                self._deleted_ids.discard(did)
-
-        # Upserts
-        for r in rows:
-            try:
-                if r.id is None:
-                    obj = _repo_create(self.repo,
-                        name=r.name,
-                        description=r.description,
-                        default_price_cents=r.default_price_cents,
-                        active=r.active,
-                    )
-                    # refresh id in table
-                    if obj is not None:
-                        new_id = getattr(obj, "id", None)
-                        if new_id is not None:
-                            # find matching item by name/desc/price on a new row
-                            # safer: re-load after save, but try to set it now
-                            pass
-                else:
-                    _repo_update(self.repo, r.id,
-                        name=r.name,
-                        description=r.description,
-                        default_price_cents=r.default_price_cents,
-                        active=r.active,
-                    )
-            except Exception as e:
-                QMessageBox.warning(self, "Save", f"Could not save '{r.name}':\n{e}")
-
+                updates.append((r.id, fields))
+        try:
+            new_ids = _repo_bulk_save(self.repo, creates, updates, sorted(self._deleted_ids))
+        except Exception as e:
+            QMessageBox.warning(self, "Save", f"Could not save catalog changes:\n{e}")
+            return
+        self._deleted_ids.clear()
+        for i, new_id in zip(created_at, new_ids):
+            rows[i].id = new_id
+
+        if self.model.canFetchMore():
+            # pages still to come are offsets into the old name order; start over,
+            # then put the selection back on the same catalog id if it is loaded
+            sel = self._selected_row()
+            sel_id = rows[sel].id if sel is not None else None
+            self._load()
+            if sel_id is not None:
+                self._select_id(sel_id)
+        else:
+            # deleted rows already left the model; keep rows, selection and scroll as they are
+            self.model.mark_saved(rows)
         QMessageBox.information(self, "Saved", "Catalog changes saved.")
-        self._load()
 
     # ---------- filter ----------
     def _apply_filter(self):
         needle = (self.search.text() or "").strip().lower()
-        for r in range(self.tbl.rowCount()):
-            name = self.tbl.item(r, 0).text().lower() if self.tbl.item(r, 0) else ""
-            desc = self.tbl.item(r, 1).text().lower() if self.tbl.item(r, 1) else ""
-            self.tbl.setRowHidden(r, not (needle in name or needle in desc))
+        if needle:
+            self.model.fetch_all()  # search covers rows not paged in yet
+        self.proxy.set_needle(needle)
@@ -1,17 +1,142 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-from typing import Any, List, Optional
+import functools
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QTableWidget,
-    QTableWidgetItem, QAbstractItemView, QHeaderView, QCheckBox, QLabel, QMessageBox
+    QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QTableView,
+    QAbstractItemView, QHeaderView, QLabel, QMessageBox
 )
 
+from .common import _RIGHTV, _get_repo, _to_dollars
 
-def _to_dollars(cents: int) -> float:
-    return float(cents or 0) / 100.0
+
+@dataclass(slots=True)  # one small object per row instead of a live ORM instance
+class _PickRow:
+    id: Optional[int]
+    name: str
+    description: str
+    default_price_cents: int
+    active: bool
+    # display text for the read-only columns, formatted once per row instead of per paint
+    price_str: str = field(default="", init=False, repr=False, compare=False)
+    active_str: str = field(default="", init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.price_str = f"{_to_dollars(self.default_price_cents):.2f}"
+        self.active_str = "Yes" if self.active else "No"
+
+
+class _PickModel(QAbstractTableModel):
+    """
+    Read-only catalog rows plus a checkable selection column. Rows are paged in
+    PAGE_SIZE at a time via canFetchMore/fetchMore; checked ids (-> name, for
+    ordering) survive re-queries, so a new search keeps earlier picks.
+    """
+    HEADERS = ["", "Name", "Description", "Default Rate", "Active"]
+    PAGE_SIZE = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows: List[_PickRow] = []
+        self.checked: dict[int, str] = {}
+        self._fetch_page: Optional[Callable[[int, int], List[_PickRow]]] = None
+        self._total = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        base = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        return base | Qt.ItemIsUserCheckable if index.column() == 0 else base
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        r = self.rows[index.row()]
+        col = index.column()
+        if role == Qt.CheckStateRole and col == 0:
+            return Qt.Checked if r.id in self.checked else Qt.Unchecked
+        if role == Qt.DisplayRole:
+            if col == 1:
+                return r.name
+            if col == 2:
+                return r.description
+            if col == 3:
+                return r.price_str
+            if col == 4:
+                return r.active_str
+        if role == Qt.TextAlignmentRole and col == 3:
+            return _RIGHTV
+        return None
+
+    def setData(self, index: QModelIndex, value, role=Qt.EditRole):
+        if not (index.isValid() and index.column() == 0 and role == Qt.CheckStateRole):
+            return False
+        self.set_checked([index.row()], Qt.CheckState(value) == Qt.Checked)
+        return True
+
+    def set_source(self, fetch_page: Callable[[int, int], List[_PickRow]], total: int):
+        self.beginResetModel()
+        self.rows = []
+        self._fetch_page, self._total = fetch_page, int(total)
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetch_page is not None and len(self.rows) < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        page = self._fetch_page(len(self.rows), self.PAGE_SIZE)
+        if not page:
+            self._total = len(self.rows)
+            return
+        at = len(self.rows)
+        self.beginInsertRows(QModelIndex(), at, at + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def fetch_all(self):
+        while self.canFetchMore():
+            self.fetchMore()
+
+    def set_checked(self, row_idxs: List[int], state: bool):
+        for i in row_idxs:
+            r = self.rows[i]
+            if r.id is None:
+                continue
+            if state:
+                self.checked[r.id] = r.name
+            else:
+                self.checked.pop(r.id, None)
+        if row_idxs:
+            self.dataChanged.emit(self.index(min(row_idxs), 0), self.index(max(row_idxs), 0),
+                                  [Qt.CheckStateRole])
+
+    def set_all_checked(self, state: bool):
+        """(Un)check every loaded row: one dict update and one dataChanged for the column."""
+        if not self.rows:
+            return
+        if state:
+            self.checked.update((r.id, r.name) for r in self.rows if r.id is not None)
+        else:
+            for r in self.rows:
+                self.checked.pop(r.id, None)
+        self.dataChanged.emit(self.index(0, 0), self.index(len(self.rows) - 1, 0), [Qt.CheckStateRole])
 
 
 class CatalogPickerDialog(QDialog):
@@ -24,14 +149,21 @@ class CatalogPickerDialog(QDialog):
     - Columns: Selected | Name | Description | Default Rate | Active
     - selected_ids() returns list of catalog row ids
     """
+    _STYLE = """
+        QDialog { background: #fafafa; }
+        QLineEdit { padding: 6px; }
+        QPushButton { padding: 6px 10px; }
+        QTableView { gridline-color: #dddddd; }
+        QTableView::item:selected { background: #e5f3ff; color: #111111; }
+    """
+
     def __init__(self, parent=None, repo: Any = None, title: str = "Select Services from Catalog"):
         super().__init__(parent)
         self.setWindowTitle(title)
         self.setMinimumWidth(700)
-        self._repo = getattr(parent, "repo", repo) or repo
+        self._repo = _get_repo(parent, repo)
 
-        self._rows: List[Any] = []   # raw repo rows
-        self._id_col = 1             # we will store id on the Name item (col 1)
+        self.model = _PickModel(self)
 
         root = QVBoxLayout(self)
 
@@ -47,8 +179,8 @@ class CatalogPickerDialog(QDialog):
         root.addLayout(top)
 
         # Table
-        self.tbl = QTableWidget(0, 5)
-        self.tbl.setHorizontalHeaderLabels(["", "Name", "Description", "Default Rate", "Active"])
+        self.tbl = QTableView()
+        self.tbl.setModel(self.model)
         hh = self.tbl.horizontalHeader()
         hh.setSectionResizeMode(0, QHeaderView.ResizeToContents)
         hh.setSectionResizeMode(1, QHeaderView.Stretch)
@@ -72,98 +204,66 @@ class CatalogPickerDialog(QDialog):
         root.addLayout(bot)
 
         # Style
-        self.setStyleSheet("""
-            QDialog { background: #fafafa; }
-            QLineEdit { padding: 6px; }
-            QPushButton { padding: 6px 10px; }
-            QTableWidget { gridline-color: #dddddd; }
-        """)
+        self.setStyleSheet(self._STYLE)
 
         # Signals
-        self.search.textChanged.connect(self._apply_filter)
-        self.btn_all.clicked.connect(lambda: self._bulk_select(True))
-        self.btn_none.clicked.connect(lambda: self._bulk_select(False))
+        # debounce: a burst of keystrokes runs one catalog query
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        self.search.textChanged.connect(self._filter_timer.start)
+        self.btn_all.clicked.connect(functools.partial(self._bulk_select, True))
+        self.btn_none.clicked.connect(functools.partial(self._bulk_select, False))
         self.btn_ok.clicked.connect(self.accept)
         self.btn_cancel.clicked.connect(self.reject)
-        self.tbl.cellDoubleClicked.connect(self._toggle_row_checkbox)
+        self.tbl.doubleClicked.connect(self._toggle_row_checkbox)
 
         # Load rows
         self._load()
 
     # ---------- data ----------
     def _load(self):
-        self.tbl.setRowCount(0)
-        self._rows.clear()
-        rows = []
+        """(Re)query the catalog for the current search text; rows page in as the view scrolls."""
+        needle = (self.search.text() or "").strip() or None
+        total = 0
         try:
-            rows = self._repo.list_catalog(active_only=True) if self._repo else []
+            total = self._repo.count_catalog(include_inactive=False, needle=needle) if self._repo else 0
         except Exception as e:
             QMessageBox.warning(self, "Catalog", f"Could not load catalog:\n{e}")
-        self._rows = rows or []
-        for r in self._rows:
-            self._insert_row(r)
-
-        self._apply_filter()
-
-    def _insert_row(self, r: Any):
-        row = self.tbl.rowCount()
-        self.tbl.insertRow(row)
+        self.model.set_source(lambda offset, limit: self._fetch_page(offset, limit, needle), total)
+        self.model.fetchMore()
 
-        # Selected checkbox
-        chk = QCheckBox()
-        chk.setChecked(False)
-        self.tbl.setCellWidget(row, 0, chk)
-
-        # Name with id on UserRole
-        name = str(getattr(r, "name", "") or "")
-        it_name = QTableWidgetItem(name)
-        it_name.setData(Qt.UserRole, getattr(r, "id", None))
-        self.tbl.setItem(row, 1, it_name)
-
-        # Description
-        it_desc = QTableWidgetItem(str(getattr(r, "description", "") or ""))
-        self.tbl.setItem(row, 2, it_desc)
-
-        # Default Rate
-        price = _to_dollars(int(getattr(r, "default_price_cents", 0) or 0))
-        it_price = QTableWidgetItem(f"{price:.2f}")
-        it_price.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.tbl.setItem(row, 3, it_price)
-
-        # Active flag
-        it_active = QTableWidgetItem("Yes" if bool(getattr(r, "active", True)) else "No")
-        self.tbl.setItem(row, 4, it_active)
+    def _fetch_page(self, offset: int, limit: int, needle: Optional[str]) -> List[_PickRow]:
+        try:
+            rows = self._repo.list_catalog_page(offset, limit, include_inactive=False, needle=needle)
+        except Exception as e:
+            QMessageBox.warning(self, "Catalog", f"Could not load catalog:\n{e}")
+            return []
+        return [_PickRow(
+            id=getattr(c, "id", None),
+            name=str(getattr(c, "name", "") or ""),
+            description=str(getattr(c, "description", "") or ""),
+            default_price_cents=int(getattr(c, "default_price_cents", 0) or 0),
+            active=bool(getattr(c, "active", True)),
+        ) for c in rows]
 
     # ---------- UX helpers ----------
     def _apply_filter(self):
-        needle = (self.search.text() or "").strip().lower()
-        for r in range(self.tbl.rowCount()):
-            name = self.tbl.item(r, 1).text().lower() if self.tbl.item(r, 1) else ""
-            desc = self.tbl.item(r, 2).text().lower() if self.tbl.item(r, 2) else ""
-            visible = (needle in name) or (needle in desc)
-            self.tbl.setRowHidden(r, not visible)
+        # search runs in SQL (name/description LIKE); just re-query
+        self._load()
 
     def _bulk_select(self, state: bool):
-        for r in range(self.tbl.rowCount()):
-            if not self.tbl.isRowHidden(r):
-                w = self.tbl.cellWidget(r, 0)
-                if isinstance(w, QCheckBox):
-                    w.setChecked(state)
+        # applies to every row matching the current search, not only the paged-in ones
+        self.model.fetch_all()
+        self.model.set_all_checked(state)
 
-    def _toggle_row_checkbox(self, row: int, col: int):
+    def _toggle_row_checkbox(self, index: QModelIndex):
         # double-click anywhere on the row toggles the checkbox
-        w = self.tbl.cellWidget(row, 0)
-        if isinstance(w, QCheckBox):
-            w.setChecked(not w.isChecked())
+        row = index.row()
+        self.model.set_checked([row], self.model.rows[row].id not in self.model.checked)
 
     # ---------- API ----------
     def selected_ids(self) -> List[int]:
-        out: List[int] = []
-        for r in range(self.tbl.rowCount()):
-            w = self.tbl.cellWidget(r, 0)
-            if isinstance(w, QCheckBox) and w.isChecked():
-                it = self.tbl.item(r, self._id_col)
-                cid = it.data(Qt.UserRole) if it else None
-                if cid is not None:
-                    out.append(int(cid))
-        return out
+        # catalog order (name, id), like the table
+        return [cid for cid, _ in sorted(self.model.checked.items(), key=lambda kv: (kv[1], kv[0]))]
@@ -2,13 +2,91 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+from contextlib import contextmanager
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QTableWidgetItem
+from sqlalchemy.orm import Session
+
+_RIGHTV = int(Qt.AlignRight | Qt.AlignVCenter)   # TextAlignmentRole value for money columns
+
 def _get_repo(parent, fallback=None):
-    if fallback is not None:
+    """
+    The Repo a dialog should use: an explicitly passed repo wins, then the parent's
+    `repo`. A bare Session (CatalogManagerDialog's first argument) is only used
+    when the parent has no repo.
+    """
+    if fallback is not None and not isinstance(fallback, Session):
         return fallback
-    return getattr(parent, "repo", None)
+    return getattr(parent, "repo", None) or fallback
+
+# Stylesheet fragments shared by the Customer/Site/Details dialogs; each composes
+# its class-level _STYLE from these so the three stay visually in step.
+# Labels opt in with setProperty("role", ...) rather than an objectName.
+_DIALOG_STYLE = """
+    QLabel[role="title"] { font-size: 18px; font-weight: 600; padding-left: 8px; }
+    QGroupBox { font-weight: 600; }
+"""
+
+_TABLE_STYLE = """
+    /* stripes and selection are view properties (palette colours the delegate
+       paints with), not per-item ::item:alternate / ::item:selected rules */
+    QTableView {
+        alternate-background-color: #f8fafc;
+        /* Better readability for selected table rows */
+        selection-background-color: #e5f3ff;
+        selection-color: #111111;
+    }
+    QHeaderView::section {
+        font-weight: 600;
+        background: #f8fafc;
+        border: 1px solid #e5e7eb;
+        padding: 4px 6px;
+    }
+"""
 
 def _to_cents(dollars: float) -> int:
     return int(round(float(dollars or 0.0) * 100))
 
 def _to_dollars(cents: int) -> float:
     return float(cents or 0) / 100.0
+
+def _cents_text(cents: int) -> str:
+    """'12.34' straight from integer cents (same text as f"{dollars:.2f}", no float)."""
+    c = int(cents or 0)
+    d, m = divmod(abs(c), 100)
+    return f"{'-' if c < 0 else ''}{d}.{m:02d}"
+
+@contextmanager
+def _bulk_fill(tbl, rows: int | None = None):
+    """
+    Fill a QTableWidget without a relayout/repaint or itemChanged per cell:
+    updates and signals are off inside the block (sorting too, if enabled), and
+    `rows` pre-sizes the table so the loop can setItem() by index.
+    """
+    sorting = tbl.isSortingEnabled()
+    tbl.setSortingEnabled(False)
+    tbl.setUpdatesEnabled(False)
+    blocked = tbl.blockSignals(True)
+    try:
+        if rows is not None:
+            tbl.setRowCount(rows)
+        yield tbl
+    finally:
+        tbl.blockSignals(blocked)
+        tbl.setSortingEnabled(sorting)
+        tbl.setUpdatesEnabled(True)
+        tbl.viewport().update()
+
+def _fill_money_rows(tbl, rows, *, _Item=QTableWidgetItem, _align=_RIGHTV, _fmt=_cents_text):
+    """
+    Fill the two-column (description, price) tables the SO and invoice dialogs
+    share from (text, cents) pairs, in one _bulk_fill pass. The defaults bind the
+    item class, alignment and formatter as locals for the loop.
+    """
+    with _bulk_fill(tbl, len(rows)):
+        for r, (text, cents) in enumerate(rows):
+            tbl.setItem(r, 0, _Item(text or "Service"))
+            it = _Item(_fmt(cents))
+            it.setTextAlignment(_align)
+            tbl.setItem(r, 1, it)
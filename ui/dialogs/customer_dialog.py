@@ -8,6 +8,8 @@ from PySide6.QtWidgets import (
     QLabel, QPushButton, QComboBox, QCheckBox, QSpinBox, QGroupBox, QMessageBox
 )
 
+from .common import _DIALOG_STYLE
+
 def _spacer(px: int = 8) -> QWidget:
     w = QWidget()
     w.setFixedHeight(px)
@@ -21,6 +23,15 @@ class CustomerDialog(QDialog):
     - Right column: payment profile (optional), tidy groups
     - values() returns the same shape you already use, including optional 'payment_profile'
     """
+    _STYLE = _DIALOG_STYLE + """
+        QLineEdit, QTextEdit, QComboBox, QSpinBox {
+            padding: 6px;
+        }
+        QPushButton {
+            padding: 6px 12px;
+        }
+    """
+
     def __init__(self, parent=None, obj=None, repo=None):
         super().__init__(parent)
         self.setWindowTitle("Customer")
@@ -66,17 +77,24 @@ class CustomerDialog(QDialog):
         pay_form.addRow("Billing Street", self.bill_street)
         pay_form.addRow("City/State/ZIP", self.bill_city_state_zip)
 
-        # Sub-groups inline labels for clarity
-        pay_form.addRow(QLabel("ACH"))
-        pay_form.addRow("Routing", self.ach_routing)
-        pay_form.addRow("Account", self.ach_account)
-
-        pay_form.addRow(QLabel("Card"))
-        pay_form.addRow("Brand", self.card_brand)
-        pay_form.addRow("Last4", self.card_last4)
-        pay_form.addRow("Name on Card", self.card_name)
-        pay_form.addRow("Exp. Month", self.card_exp_month)
-        pay_form.addRow("Exp. Year", self.card_exp_year)
+        # Method-specific sub-groups; enabling a group enables its fields
+        self.grp_ach = QGroupBox("ACH")
+        ach_form = QFormLayout(self.grp_ach)
+        ach_form.setLabelAlignment(Qt.AlignRight)
+        ach_form.addRow("Routing", self.ach_routing)
+        ach_form.addRow("Account", self.ach_account)
+        pay_form.addRow(self.grp_ach)
+
+        self.grp_card = QGroupBox("Card")
+        card_form = QFormLayout(self.grp_card)
+        card_form.setLabelAlignment(Qt.AlignRight)
+        card_form.addRow("Brand", self.card_brand)
+        card_form.addRow("Last4", self.card_last4)
+        card_form.addRow("Name on Card", self.card_name)
+        card_form.addRow("Exp. Month", self.card_exp_month)
+        card_form.addRow("Exp. Year", self.card_exp_year)
+        pay_form.addRow(self.grp_card)
+
         pay_form.addRow("", self.chk_default)
 
         pay_wrap = QVBoxLayout(self.grp_pay)
@@ -103,7 +121,7 @@ class CustomerDialog(QDialog):
 
         root = QVBoxLayout(self)
         hdr = QLabel("Customer")
-        hdr.setObjectName("dlgTitle")
+        hdr.setProperty("role", "title")
         root.addWidget(hdr)
         root.addWidget(_spacer(6))
         root.addLayout(body, 1)
@@ -122,16 +140,7 @@ class CustomerDialog(QDialog):
 
     # ---------- Style
     def _apply_style(self):
-        self.setStyleSheet("""
-        QLabel#dlgTitle { font-size: 18px; font-weight: 600; padding-left: 8px; }
-        QGroupBox { font-weight: 600; }
-        QLineEdit, QTextEdit, QComboBox, QSpinBox {
-            padding: 6px;
-        }
-        QPushButton {
-            padding: 6px 12px;
-        }
-        """)
+        self.setStyleSheet(self._STYLE)
 
     # ---------- Data
     def _load_obj(self):
@@ -144,13 +153,8 @@ class CustomerDialog(QDialog):
 
     def _toggle_payment_fields(self, method_text: str):
         method = (method_text or "Other").lower()
-        use_ach = method == "ach"
-        use_card = method == "card"
-
-        for w in (self.ach_routing, self.ach_account):
-            w.setEnabled(use_ach)
-        for w in (self.card_brand, self.card_last4, self.card_name, self.card_exp_month, self.card_exp_year):
-            w.setEnabled(use_card)
+        self.grp_ach.setEnabled(method == "ach")
+        self.grp_card.setEnabled(method == "card")
 
     # ---------- Output
     def values(self) -> dict:
@@ -173,32 +177,32 @@ class CustomerDialog(QDialog):
         )
 
         method_text = (self.cmb_method.currentText() or "Other").strip()
-        touched = any([
-            self.bill_street.text().strip(),
-            self.bill_city_state_zip.text().strip(),
-            self.ach_routing.text().strip(),
-            self.ach_account.text().strip(),
-            self.card_brand.text().strip(),
-            self.card_last4.text().strip(),
-            self.card_name.text().strip(),
-            self.card_exp_month.value() > 0,
-            self.card_exp_year.value() > 0,
-            self.chk_default.isChecked(),
-        ])
-
-        if touched or method_text != "Other":
+        # short-circuits: stops at the first field that has something in it
+        touched = (
+            method_text != "Other"
+            or any(le.text().strip() for le in (
+                self.bill_street, self.bill_city_state_zip, self.ach_routing, self.ach_account,
+                self.card_brand, self.card_last4, self.card_name,
+            ))
+            or self.card_exp_month.value() > 0
+            or self.card_exp_year.value() > 0
+            or self.chk_default.isChecked()
+        )
+
+        if touched:
+            method = method_text.lower()
             pp = dict(
-                method=method_text.lower(),
+                method=method,
                 billing_street=self.bill_street.text().strip(),
                 billing_city_state_zip=self.bill_city_state_zip.text().strip(),
                 default=self.chk_default.isChecked(),
             )
-            if pp["method"] == "ach":
+            if method == "ach":
                 pp.update(
                     ach_routing=self.ach_routing.text().strip(),
                     ach_account=self.ach_account.text().strip(),
                 )
-            elif pp["method"] == "card":
+            elif method == "card":
                 pp.update(
                     card_brand=self.card_brand.text().strip(),
                     card_last4=self.card_last4.text().strip(),
@@ -1,21 +1,20 @@
 # C:\Users\tyler\Desktop\FoundersSOManager\ui\dialogs\details_dialog.py
 from __future__ import annotations
 
-from typing import Optional, Iterable
-from PySide6.QtCore import Qt
+from typing import Optional, Iterable, List
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
 from PySide6.QtWidgets import (
     QDialog, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QTextEdit,
-    QLabel, QPushButton, QTableWidget, QTableWidgetItem, QGroupBox,
+    QLabel, QPushButton, QTableView, QGroupBox,
     QAbstractItemView, QHeaderView
 )
 
+from .common import _DIALOG_STYLE, _TABLE_STYLE, _RIGHTV, _cents_text
+
 # ---------- helpers
 def _spacer(px: int = 8) -> QWidget:
     w = QWidget(); w.setFixedHeight(px); return w
 
-def _to_dollars(cents: int) -> float:
-    return float(cents or 0) / 100.0
-
 def _ro_line(text: str = "") -> QLineEdit:
     le = QLineEdit(text or "")
     le.setReadOnly(True)
@@ -31,6 +30,56 @@ def _ro_text(text: str = "") -> QTextEdit:
     return te
 
 
+# (label, attribute, read-only widget) for the Customer and Site forms
+_CUST_FIELDS = (
+    ("Name",  "name",  _ro_line),
+    ("Phone", "phone", _ro_line),
+    ("Email", "email", _ro_line),
+    ("Notes", "notes", _ro_text),
+)
+_SITE_FIELDS = (
+    ("Name",      "name",         _ro_line),
+    ("Address",   "address",      _ro_text),
+    ("POC Name",  "poc_name",     _ro_line),
+    ("POC Phone", "poc_phone",    _ro_line),
+    ("POC Email", "poc_email",    _ro_line),
+    ("Cadence",   "cadence_text", _ro_line),
+    ("Notes",     "notes",        _ro_text),
+)
+
+
+class _ServicesModel(QAbstractTableModel):
+    """
+    Read-only services table with no per-cell items. Stored column-wise
+    (parallel name / price-text lists), so data() is a single list index.
+    """
+    HEADERS = ["Service", "Price ($)"]
+
+    def __init__(self, names: List[str], prices: List[str], parent=None):
+        super().__init__(parent)
+        self._cols = (names, prices)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._cols[0])
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._cols[index.column()][index.row()]
+        if role == Qt.TextAlignmentRole and index.column() == 1:
+            return _RIGHTV
+        return None
+
+
 class CustomerSiteDetailsDialog(QDialog):
     """
     Read only viewer for a Customer, optional Site, and Contracted Services.
@@ -38,6 +87,11 @@ class CustomerSiteDetailsDialog(QDialog):
     - Fields are selectable for easy copy
     - Services table highlights the selected row and shows a total
     """
+    _STYLE = _DIALOG_STYLE + _TABLE_STYLE + """
+        QLineEdit, QTextEdit { padding: 6px; }
+        QLabel[role="total"] { font-weight: 600; padding: 4px 2px; }
+    """
+
     def __init__(self, parent=None, *, customer=None, site=None, services: Optional[Iterable]=None):
         super().__init__(parent)
         self.setWindowTitle("Details")
@@ -48,83 +102,75 @@ class CustomerSiteDetailsDialog(QDialog):
             gb_c = QGroupBox("Customer")
             form_c = QFormLayout(gb_c)
             form_c.setLabelAlignment(Qt.AlignRight)
-            form_c.addRow("Name",  _ro_line(getattr(customer, "name", "") or ""))
-            form_c.addRow("Phone", _ro_line(getattr(customer, "phone", "") or ""))
-            form_c.addRow("Email", _ro_line(getattr(customer, "email", "") or ""))
-            form_c.addRow("Notes", _ro_text(getattr(customer, "notes", "") or ""))
+            for label, attr, ctor in _CUST_FIELDS:
+                form_c.addRow(label, ctor(getattr(customer, attr, "") or ""))
 
         gb_s = None
         if site is not None:
             gb_s = QGroupBox("Site")
             form_s = QFormLayout(gb_s)
             form_s.setLabelAlignment(Qt.AlignRight)
-            form_s.addRow("Name",       _ro_line(getattr(site, "name", "") or ""))
-            form_s.addRow("Address",    _ro_text(getattr(site, "address", "") or ""))
-            form_s.addRow("POC Name",   _ro_line(getattr(site, "poc_name", "") or ""))
-            form_s.addRow("POC Phone",  _ro_line(getattr(site, "poc_phone", "") or ""))
-            form_s.addRow("POC Email",  _ro_line(getattr(site, "poc_email", "") or ""))
-            form_s.addRow("Cadence",    _ro_line(getattr(site, "cadence_text", "") or ""))
-            form_s.addRow("Notes",      _ro_text(getattr(site, "notes", "") or ""))
+            for label, attr, ctor in _SITE_FIELDS:
+                form_s.addRow(label, ctor(getattr(site, attr, "") or ""))
 
         gb_sv = None
-        total = 0.0
         if services is not None:
-            # filter active rows if an 'active' attr exists
-            rows = list(services)
-            try:
-                rows = [s for s in rows if bool(getattr(s, "active", True))]
-            except Exception:
-                pass
+            # active rows only (objects without an 'active' attr count as active);
+            # one pass, so a one-shot iterator is consumed exactly once
+            rows = [s for s in services if getattr(s, "active", True)]
+
+            # pull each attribute out once into parallel lists; the model and
+            # the total (in cents, so no float drift) both work off those
+            names = [getattr(s, "name", "") or "" for s in rows]
+            cents = [int(getattr(s, "unit_price_cents", 0) or 0) for s in rows]
+            total_cents = sum(cents)
+            prices = [_cents_text(c) for c in cents]
 
             gb_sv = QGroupBox("Contracted Services")
-            tbl = QTableWidget(0, 2, gb_sv)
-            tbl.setHorizontalHeaderLabels(["Service", "Price ($)"])
-            tbl.verticalHeader().setVisible(False)
+            tbl = QTableView(gb_sv)
+            tbl.setModel(_ServicesModel(names, prices, tbl))
+            # single-line cells at a fixed row height: nothing ever measures rows
+            vh = tbl.verticalHeader()
+            vh.setVisible(False)
+            vh.setSectionResizeMode(QHeaderView.Fixed)
+            vh.setDefaultSectionSize(tbl.fontMetrics().height() + 8)
+            tbl.setWordWrap(False)
             tbl.setAlternatingRowColors(True)
             tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
             tbl.setSelectionMode(QAbstractItemView.SingleSelection)
             tbl.setEditTriggers(QAbstractItemView.NoEditTriggers)
             hh = tbl.horizontalHeader()
             hh.setSectionResizeMode(0, QHeaderView.Stretch)
-            hh.setSectionResizeMode(1, QHeaderView.ResizeToContents)
-
-            for s in rows:
-                r = tbl.rowCount()
-                tbl.insertRow(r)
-                name = getattr(s, "name", "") or ""
-                price = _to_dollars(getattr(s, "unit_price_cents", 0))
-                total += price
-                tbl.setItem(r, 0, QTableWidgetItem(name))
-                itp = QTableWidgetItem(f"{price:.2f}")
-                itp.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                tbl.setItem(r, 1, itp)
+            # fixed price column: a shown/reset table never measures every row's text
+            hh.setSectionResizeMode(1, QHeaderView.Fixed)
+            hh.resizeSection(1, 100)
 
             layout_sv = QVBoxLayout(gb_sv)
             layout_sv.addWidget(tbl)
             # total row
             total_row = QHBoxLayout()
             total_row.addStretch(1)
-            lbl_total = QLabel(f"Total: ${total:,.2f}")
-            lbl_total.setObjectName("totalLabel")
+            lbl_total = QLabel(f"Total: ${total_cents / 100:,.2f}")
+            lbl_total.setProperty("role", "total")
             total_row.addWidget(lbl_total)
             layout_sv.addLayout(total_row)
 
         # ---------- layout
         root = QVBoxLayout(self)
-        hdr = QLabel("Details"); hdr.setObjectName("dlgTitle")
+        hdr = QLabel("Details"); hdr.setProperty("role", "title")
         root.addWidget(hdr)
         root.addWidget(_spacer(6))
 
-        # two column body like CustomerDialog
+        # two column body like CustomerDialog; a column with nothing to show is
+        # not built, and each column is a plain layout (no wrapper QWidget)
         body = QHBoxLayout()
-        left = QWidget(); lc = QVBoxLayout(left); lc.setContentsMargins(8, 8, 8, 8)
-        right = QWidget(); rc = QVBoxLayout(right); rc.setContentsMargins(8, 8, 8, 8)
-        if gb_c: lc.addWidget(gb_c)
-        if gb_s: lc.addWidget(gb_s)
-        if gb_sv: rc.addWidget(gb_sv)
-
-        body.addWidget(left, 1)
-        body.addWidget(right, 1)
+        for groups in ([g for g in (gb_c, gb_s) if g], [gb_sv] if gb_sv else []):
+            if not groups:
+                continue
+            col = QVBoxLayout(); col.setContentsMargins(8, 8, 8, 8)
+            for g in groups:
+                col.addWidget(g)
+            body.addLayout(col, 1)
         root.addLayout(body, 1)
 
         # buttons
@@ -141,19 +187,4 @@ class CustomerSiteDetailsDialog(QDialog):
 
     # ---------- style to match your modern dialogs and improve selection contrast
     def _apply_style(self):
-        self.setStyleSheet("""
-        QLabel#dlgTitle { font-size: 18px; font-weight: 600; padding-left: 8px; }
-        QGroupBox { font-weight: 600; }
-
-        QLineEdit, QTextEdit { padding: 6px; }
-        /* Better readability for selected table rows */
-        QTableView::item:selected { background: #e5f3ff; color: #111111; }
-
-        QHeaderView::section {
-            font-weight: 600;
-            background: #f8fafc;
-            border: 1px solid #e5e7eb;
-            padding: 4px 6px;
-        }
-        QLabel#totalLabel { font-weight: 600; padding: 4px 2px; }
-        """)
+        self.setStyleSheet(self._STYLE)
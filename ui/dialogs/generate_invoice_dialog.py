@@ -8,11 +8,11 @@ import random
 from PySide6.QtCore import QDate
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QTextEdit,
-    QLabel, QPushButton, QComboBox, QDoubleSpinBox, QTableWidget, QTableWidgetItem,
+    QLabel, QPushButton, QComboBox, QDoubleSpinBox, QTableWidget,
     QFileDialog, QMessageBox, QWidget
 )
 
-from .common import _get_repo, _to_cents, _to_dollars
+from .common import _get_repo, _to_cents, _fill_money_rows
 
 _AUTO_TAG = "[AutoNote]:"
 
@@ -154,11 +154,7 @@ class GenerateInvoiceDialog(QDialog):
         self.lblBillTo.setPlainText("\n".join([x for x in bill_lines if x]))
 
         self.tbl.setRowCount(0)
-        for desc, amt_cents in seed["line_items_cents"]:
-            r = self.tbl.rowCount(); self.tbl.insertRow(r)
-            self.tbl.setItem(r, 0, QTableWidgetItem(desc or "Service"))
-            itp = QTableWidgetItem(f"{_to_dollars(amt_cents):.2f}"); itp.setTextAlignment(Qt.AlignRight)
-            self.tbl.setItem(r, 1, itp)
+        _fill_money_rows(self.tbl, seed["line_items_cents"])
 
         out_dir = os.path.join("invoices")
         os.makedirs(out_dir, exist_ok=True)
@@ -1,19 +1,143 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import functools
+from dataclasses import dataclass, asdict
+from datetime import date
 from typing import Optional
-from PySide6.QtCore import Qt, QDate
+from PySide6.QtCore import (
+    Qt, QDate, QTimer, QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, Signal
+)
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QTextEdit, QDateEdit,
-    QCheckBox, QGroupBox, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
-    QAbstractItemView, QListWidget, QListWidgetItem
+    QCheckBox, QGroupBox, QLabel, QPushButton, QTableWidget,
+    QAbstractItemView, QListView, QHeaderView
 )
 
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
 from ..employee_dialogs import AssignStaffDialog
+from .common import _fill_money_rows
+
+
+# ----- display rows (plain tuples, safe to hand across threads)
+def _service_rows(links) -> list[tuple[str, int]]:
+    return [
+        (lk.site_service.name if lk.site_service else "Service", int(getattr(lk, "unit_price_cents", 0) or 0))
+        for lk in links
+    ]
+
+def _staff_rows(assigns) -> list[tuple[str, Optional[int]]]:
+    rows = []
+    for a in assigns:
+        # a.employee is relationship; repo methods set it
+        emp = getattr(a, "employee", None)
+        if emp:
+            rows.append((f"{emp.name}  |  {emp.role or 'Staff'}", a.employee_id))
+        else:
+            rows.append((f"Employee #{a.employee_id}", a.employee_id))
+    return rows
+
+def _fetch_service_rows(so_id: int, repo):
+    return _service_rows(repo.list_services_for_so(so_id))
+
+def _fetch_staff_rows(so_id: int, repo):
+    return _staff_rows(repo.list_assignments_for_so(so_id))
+
+
+class _FetchSignals(QObject):
+    finished = Signal(str, int, object)   # (kind, generation, rows or None on error)
+
+
+class _RepoFetch(QRunnable):
+    """
+    Runs `fn(repo)` on a pool thread with its own Session (the dialog's Session
+    stays on the UI thread) and emits the plain rows it returns.
+    """
+    def __init__(self, repo, kind: str, gen: int, fn):
+        super().__init__()
+        self.signals = _FetchSignals()
+        self.key = (kind, gen)
+        self._bind = repo.s.get_bind()
+        self._repo_cls = type(repo)
+        self._fn = fn
+
+    def run(self):
+        try:
+            with Session(self._bind) as s:
+                rows = self._fn(self._repo_cls(s))
+        except Exception:
+            rows = None
+        self.signals.finished.emit(*self.key, rows)
+
+
+def _can_fetch_off_thread(repo) -> bool:
+    # only file databases on db.py's QueuePool: an in-memory SQLite engine is
+    # one connection (or one database per thread), so it stays synchronous
+    s = getattr(repo, "s", None)
+    return isinstance(s, Session) and isinstance(s.get_bind().pool, QueuePool)
+
+
+class _StaffModel(QAbstractListModel):
+    """
+    Read-only 'Name  |  Role' lines for the staff panel, with the employee id on
+    Qt.UserRole (None for the placeholder) so callers never parse the label.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lines: list[str] = []
+        self._ids: list[Optional[int]] = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._lines)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._lines[index.row()]
+        if role == Qt.UserRole:
+            return self._ids[index.row()]
+        return None
+
+    def sync(self, rows: list[tuple[str, Optional[int]]]):
+        """
+        Bring the model to `rows` by removing/inserting only the rows that differ
+        (common head and tail are left alone); no-op when nothing changed.
+        """
+        old = list(zip(self._lines, self._ids))
+        if old == rows:
+            return
+        n = min(len(old), len(rows))
+        head = 0
+        while head < n and old[head] == rows[head]:
+            head += 1
+        tail = 0
+        while tail < n - head and old[-1 - tail] == rows[-1 - tail]:
+            tail += 1
+        drop = len(old) - head - tail
+        add = rows[head:len(rows) - tail]
+        if drop:
+            self.beginRemoveRows(QModelIndex(), head, head + drop - 1)
+            del self._lines[head:head + drop]
+            del self._ids[head:head + drop]
+            self.endRemoveRows()
+        if add:
+            self.beginInsertRows(QModelIndex(), head, head + len(add) - 1)
+            self._lines[head:head] = [line for line, _ in add]
+            self._ids[head:head] = [eid for _, eid in add]
+            self.endInsertRows()
 
 
-def _to_dollars(cents: int) -> float:
-    return float(cents or 0) / 100.0
+@dataclass(slots=True)
+class _SOValues:
+    title: str
+    description: str
+    scheduled_date: date
+    completed: bool
+    invoiced: bool
+    notes: str
 
 
 class ServiceOrderDialog(QDialog):
@@ -26,6 +150,10 @@ class ServiceOrderDialog(QDialog):
         self.setWindowTitle(f"Service Order - {site_name}" if site_name else "Service Order")
         self._obj = obj            # models.ServiceOrder or None
         self._repo = repo          # Repo
+        self._loaded = False       # services/staff tables filled on first show
+        self._cached: Optional[_SOValues] = None   # form snapshot taken on accept()
+        self._fetches: dict[tuple, _RepoFetch] = {}   # in-flight background loads
+        self._gen = {"services": 0, "staff": 0}    # newest request per table
 
         # --- core fields
         self.title = QLineEdit()
@@ -39,8 +167,15 @@ class ServiceOrderDialog(QDialog):
         self.grp_inc = QGroupBox("Included Services (snapshot)")
         self.tbl = QTableWidget(0, 2)
         self.tbl.setHorizontalHeaderLabels(["Service", "Price ($)"])
-        self.tbl.horizontalHeader().setStretchLastSection(True)
-        self.tbl.verticalHeader().setVisible(False)
+        # fixed row height and price width: nothing is sized from cell contents
+        hh = self.tbl.horizontalHeader()
+        hh.setSectionResizeMode(0, QHeaderView.Stretch)
+        hh.setSectionResizeMode(1, QHeaderView.Fixed)
+        hh.resizeSection(1, 100)
+        vh = self.tbl.verticalHeader()
+        vh.setVisible(False)
+        vh.setSectionResizeMode(QHeaderView.Fixed)
+        vh.setDefaultSectionSize(self.tbl.fontMetrics().height() + 8)
         self.tbl.setAlternatingRowColors(True)
         self.tbl.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
@@ -50,9 +185,10 @@ class ServiceOrderDialog(QDialog):
 
         # --- assigned staff (NEW)
         self.grp_staff = QGroupBox("Assigned Staff")
-        self.staff_list = QListWidget()
+        self.staff_list = QListView()
+        self._staff_model = _StaffModel(self)
+        self.staff_list.setModel(self._staff_model)
         self.staff_list.setSelectionMode(QAbstractItemView.NoSelection)
-        self.staff_list.setAlternatingRowColors(True)
         self.btn_assign = QPushButton("Assign...")
         self.btn_refresh_staff = QPushButton("Refresh")
         sbtns = QHBoxLayout()
@@ -87,16 +223,22 @@ class ServiceOrderDialog(QDialog):
         root.addWidget(self.grp_staff, 1)
         root.addLayout(btns)
 
-        # signals
+        # signals: bound methods only (no lambdas or SIGNAL("...") strings); the
+        # slots are plain methods that take no arguments, so clicked(bool) is dropped
         self.btn_ok.clicked.connect(self.accept)
         self.btn_cancel.clicked.connect(self.reject)
         self.btn_refresh_staff.clicked.connect(self._load_assignments)
         self.btn_assign.clicked.connect(self._open_assign_dialog)
 
-        # populate
+        # populate: the form now, the repo-backed tables after the first paint
         self._load_obj()
-        self._load_included_services()
-        self._load_assignments()
+
+    def showEvent(self, ev):
+        super().showEvent(ev)
+        if not self._loaded:
+            self._loaded = True
+            QTimer.singleShot(0, self._load_included_services)
+            QTimer.singleShot(0, self._load_assignments)
 
     # ----- data loads
     def _load_obj(self):
@@ -111,47 +253,55 @@ class ServiceOrderDialog(QDialog):
         self.invoiced.setChecked(bool(self._obj.invoiced))
         self.notes.setPlainText(self._obj.notes or "")
 
+    def _fetch(self, kind: str, fn):
+        """
+        fn(repo) -> rows, then the kind's _apply_* slot. Off the UI thread when
+        the engine allows it; a reply from an older request (e.g. a double
+        Refresh) is dropped.
+        """
+        self._gen[kind] += 1
+        if not _can_fetch_off_thread(self._repo):
+            try:
+                rows = fn(self._repo)
+            except Exception:
+                rows = None
+            self._on_fetched(kind, self._gen[kind], rows)
+            return
+        job = _RepoFetch(self._repo, kind, self._gen[kind], fn)
+        job.signals.finished.connect(self._on_fetched)
+        self._fetches[job.key] = job      # keeps the runnable's signals alive
+        QThreadPool.globalInstance().start(job)
+
+    def _on_fetched(self, kind: str, gen: int, rows):
+        self._fetches.pop((kind, gen), None)
+        if gen != self._gen[kind]:
+            return
+        if kind == "services":
+            self._apply_services(rows)
+        else:
+            self._apply_assignments(rows)
+
     def _load_included_services(self):
-        self.tbl.setRowCount(0)
         if not (self._repo and self._obj and getattr(self._obj, "id", None)):
+            self._apply_services([])
             return
-        try:
-            links = self._repo.list_services_for_so(self._obj.id)
-            for lk in links:
-                r = self.tbl.rowCount()
-                self.tbl.insertRow(r)
-                nm = lk.site_service.name if lk.site_service else "Service"
-                price = _to_dollars(getattr(lk, "unit_price_cents", 0))
-                self.tbl.setItem(r, 0, QTableWidgetItem(nm))
-                itp = QTableWidgetItem(f"{price:.2f}")
-                itp.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                self.tbl.setItem(r, 1, itp)
-        except Exception:
-            pass
+        self._fetch("services", functools.partial(_fetch_service_rows, self._obj.id))
+
+    def _apply_services(self, rows):
+        if rows is None:        # query failed: leave the table empty
+            rows = []
+        _fill_money_rows(self.tbl, rows)
 
     def _load_assignments(self):
         """Fill the read-only staff list with 'Name  |  Role' for this SO."""
-        self.staff_list.clear()
         if not (self._repo and self._obj and getattr(self._obj, "id", None)):
+            self._staff_model.sync([])
             return
-        try:
-            assigns = self._repo.list_assignments_for_so(self._obj.id)
-        except Exception:
-            assigns = []
+        self._fetch("staff", functools.partial(_fetch_staff_rows, self._obj.id))
 
-        # Build lines
-        if not assigns:
-            self.staff_list.addItem(QListWidgetItem("No staff assigned"))
-            return
-
-        for a in assigns:
-            # a.employee is relationship; repo methods set it
-            emp = getattr(a, "employee", None)
-            if emp:
-                text = f"{emp.name}  |  {emp.role or 'Staff'}"
-            else:
-                text = f"Employee #{a.employee_id}"
-            self.staff_list.addItem(QListWidgetItem(text))
+    def _apply_assignments(self, rows):
+        # a refresh after assigning one person touches one row, not the whole list
+        self._staff_model.sync(rows or [("No staff assigned", None)])
 
     # ----- assign button
     def _open_assign_dialog(self):
@@ -163,13 +313,20 @@ class ServiceOrderDialog(QDialog):
         self._load_assignments()
 
     # ----- values out
-    def values(self) -> dict:
-        sd = self.scheduled.date().toPython()
-        return dict(
+    def _read_form(self) -> _SOValues:
+        return _SOValues(
             title=self.title.text().strip(),
             description=self.description.toPlainText().strip(),
-            scheduled_date=sd,
+            scheduled_date=self.scheduled.date().toPython(),
             completed=self.completed.isChecked(),
             invoiced=self.invoiced.isChecked(),
             notes=self.notes.toPlainText().strip(),
         )
+
+    def accept(self):
+        self._cached = self._read_form()
+        super().accept()
+
+    def values(self) -> dict:
+        """A fresh dict each call (callers add keys), read once and cached on accept."""
+        return asdict(self._cached if self._cached is not None else self._read_form())
@@ -1,23 +1,161 @@
 # C:\Users\tyler\Desktop\FoundersSOManager\ui\dialogs\site_dialog.py
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Optional, List
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QStandardItemModel, QStandardItem
 from PySide6.QtWidgets import (
     QDialog, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QTextEdit,
-    QLabel, QPushButton, QComboBox, QCheckBox, QGroupBox, QMessageBox,
-    QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView, QDoubleSpinBox,
+    QLabel, QPushButton, QComboBox, QGroupBox, QMessageBox,
+    QTableView, QAbstractItemView, QHeaderView, QStyledItemDelegate,
     QSizePolicy
 )
 
-from .common import _get_repo, _to_cents, _to_dollars
-from .catalog_picker import CatalogPickerDialog
+from .common import _DIALOG_STYLE, _TABLE_STYLE, _RIGHTV, _get_repo, _to_cents, _to_dollars, _cents_text
+from ..widgets import PriceDelegate
+
+_CADENCE_ITEMS = (
+    "", "weekly", "biweekly", "monthly_same_day",
+    "monthly_nth_wd:1:0", "monthly_nth_wd:2:0", "monthly_nth_wd:3:0", "monthly_nth_wd:4:0",
+)
+_CADENCE_INDEX = {text: i for i, text in enumerate(_CADENCE_ITEMS)}
 
 
 def _spacer(px: int = 8) -> QWidget:
     w = QWidget(); w.setFixedHeight(px); return w
 
 
+@dataclass(slots=True)
+class _SvcRow:
+    active: bool
+    name: str
+    price_cents: int
+    service_id: Optional[int] = None    # SiteService id; None until saved
+    catalog_id: Optional[int] = None
+
+
+class _ServicesModel(QAbstractTableModel):
+    """
+    Editable model over a list of _SvcRow. The view only asks for visible cells,
+    so no per-row widgets exist: Active is a check state, Service/Price editors
+    come from delegates while a cell is edited. Prices stay integer cents.
+    """
+    HEADERS = ["Active", "Service", "Price ($)"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows: List[_SvcRow] = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        base = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        if index.column() == 0:
+            return base | Qt.ItemIsUserCheckable
+        return base | Qt.ItemIsEditable
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        r = self.rows[index.row()]
+        col = index.column()
+        if role == Qt.CheckStateRole and col == 0:
+            return Qt.Checked if r.active else Qt.Unchecked
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if col == 1:
+                return r.name
+            if col == 2:
+                return _to_dollars(r.price_cents) if role == Qt.EditRole else _cents_text(r.price_cents)
+            return None
+        if role == Qt.TextAlignmentRole and col == 2:
+            return _RIGHTV
+        return None
+
+    def setData(self, index: QModelIndex, value, role=Qt.EditRole):
+        if not index.isValid():
+            return False
+        r = self.rows[index.row()]
+        col = index.column()
+        if role == Qt.CheckStateRole and col == 0:
+            r.active = Qt.CheckState(value) == Qt.Checked
+        elif role == Qt.EditRole and col == 1:
+            r.name = str(value or "")
+        elif role == Qt.EditRole and col == 2:
+            r.price_cents = _to_cents(value)
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def set_rows(self, rows: List[_SvcRow]):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def append(self, row: _SvcRow) -> int:
+        return self.extend([row])
+
+    def extend(self, rows: List[_SvcRow]) -> int:
+        """Append rows with one insert notification; returns the first new row."""
+        n = len(self.rows)
+        if rows:
+            self.beginInsertRows(QModelIndex(), n, n + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+        return n
+
+    def remove(self, r: int) -> _SvcRow:
+        self.beginRemoveRows(QModelIndex(), r, r)
+        row = self.rows.pop(r)
+        self.endRemoveRows()
+        return row
+
+    def row_changed(self, r: int):
+        self.dataChanged.emit(self.index(r, 0), self.index(r, len(self.HEADERS) - 1))
+
+
+class _ServiceDelegate(QStyledItemDelegate):
+    """Editable catalog combo for the Service column; exists only while a cell is being edited."""
+    def __init__(self, dlg: "SiteDialog"):
+        super().__init__(dlg.tbl)
+        self._dlg = dlg
+
+    def createEditor(self, parent, option, index):
+        # every editor shares the dialog's one catalog model (built in _load_catalog)
+        cmb = QComboBox(parent); cmb.setEditable(True)
+        cmb.setModel(self._dlg._catalog_model)
+        return cmb
+
+    def setEditorData(self, editor, index):
+        name = index.data(Qt.EditRole) or ""
+        row = self._dlg._catalog_row_by_name.get(name)
+        # loading the cell's value is not a user change: no index/text signals
+        editor.blockSignals(True)
+        if row is None:
+            # custom name: shown as edit text, never added to the shared model
+            editor.setCurrentIndex(-1)
+            editor.setEditText(name or "Custom Service")
+        else:
+            editor.setCurrentIndex(row)
+        editor.blockSignals(False)
+
+    def setModelData(self, editor, model, index):
+        name = editor.currentText().strip()
+        self._dlg._set_row_service(index.row(), name, self._dlg._catalog_id_by_name.get(name))
+
+
 class SiteDialog(QDialog):
     """
     Site dialog matching CustomerDialog style.
@@ -25,11 +163,18 @@ class SiteDialog(QDialog):
     - Right: contracted services with toolbar
     - Safe persistence: never NULL name; flush+commit; rollback on error
     """
+    _STYLE = _DIALOG_STYLE + _TABLE_STYLE + """
+        QLineEdit, QTextEdit, QComboBox { padding: 6px; }
+        QPushButton { padding: 6px 12px; }
+    """
+
     def __init__(self, parent=None, customer_name: str = "", obj=None, repo=None):
         super().__init__(parent)
         self.setWindowTitle(f"Site - {customer_name}" if customer_name else "Site")
         self._obj = obj
         self._repo = _get_repo(parent, repo)
+        # the session rolled back before each load/persist, resolved once
+        self._session = getattr(self._repo, "s", None)
 
         self._deleted_ids: list[int] = []
 
@@ -40,10 +185,7 @@ class SiteDialog(QDialog):
         self.poc_phone = QLineEdit();  self.poc_phone.setPlaceholderText("###-###-####")
         self.poc_email = QLineEdit();  self.poc_email.setPlaceholderText("name@example.com")
         self.cadence = QComboBox()
-        self.cadence.addItems([
-            "", "weekly", "biweekly", "monthly_same_day",
-            "monthly_nth_wd:1:0", "monthly_nth_wd:2:0", "monthly_nth_wd:3:0", "monthly_nth_wd:4:0"
-        ])
+        self.cadence.addItems(_CADENCE_ITEMS)
         self.notes = QTextEdit(); self.notes.setPlaceholderText("Special access notes, scope, etc."); self.notes.setMinimumHeight(64)
 
         left_form = QFormLayout()
@@ -58,18 +200,31 @@ class SiteDialog(QDialog):
 
         # ---------- Contracted Services (right)
         self.grp_services = QGroupBox("Contracted Services")
-        self.tbl = QTableWidget(0, 3)
-        self.tbl.setHorizontalHeaderLabels(["Active", "Service", "Price ($)"])
+        self.model = _ServicesModel(self)
+        self.tbl = QTableView()
+        self.tbl.setModel(self.model)
         self.tbl.verticalHeader().setVisible(False)
         self.tbl.setAlternatingRowColors(True)
         self.tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.tbl.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.tbl.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tbl.setEditTriggers(
+            QAbstractItemView.DoubleClicked
+            | QAbstractItemView.SelectedClicked
+            | QAbstractItemView.EditKeyPressed
+        )
+        # Active is a check state; Service/Price editors exist only while editing
+        self.tbl.setItemDelegateForColumn(1, _ServiceDelegate(self))
+        self.tbl.setItemDelegateForColumn(2, PriceDelegate(self.tbl))
 
+        # Active/Price widths come from font metrics once; ResizeToContents would
+        # re-measure every row whenever one is added or removed
+        fm = self.tbl.fontMetrics()
         hh = self.tbl.horizontalHeader()
-        hh.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        hh.setSectionResizeMode(0, QHeaderView.Fixed)
+        hh.resizeSection(0, fm.horizontalAdvance("Active") + 24)
         hh.setSectionResizeMode(1, QHeaderView.Stretch)
-        hh.setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        hh.setSectionResizeMode(2, QHeaderView.Fixed)
+        hh.resizeSection(2, fm.horizontalAdvance("999,999.00") + 24)
 
         # Toolbar
         self.btn_pick = QPushButton("Pick")
@@ -98,18 +253,18 @@ class SiteDialog(QDialog):
         btns.addWidget(self.btn_save)
         btns.addWidget(self.btn_cancel)
 
-        # Two-column body
+        # Two-column body (plain layouts keep the margins without two wrapper widgets)
         body = QHBoxLayout()
-        left_col = QWidget(); lc = QVBoxLayout(left_col); lc.setContentsMargins(8, 8, 8, 8)
-        right_col = QWidget(); rc = QVBoxLayout(right_col); rc.setContentsMargins(8, 8, 8, 8)
+        lc = QVBoxLayout(); lc.setContentsMargins(8, 8, 8, 8)
+        rc = QVBoxLayout(); rc.setContentsMargins(8, 8, 8, 8)
         lc.addLayout(left_form)
         rc.addWidget(self.grp_services)
-        body.addWidget(left_col, 1)
-        body.addWidget(right_col, 1)
+        body.addLayout(lc, 1)
+        body.addLayout(rc, 1)
 
         # Root
         root = QVBoxLayout(self)
-        hdr = QLabel("Site Details"); hdr.setObjectName("dlgTitle")
+        hdr = QLabel("Site Details"); hdr.setProperty("role", "title")
         root.addWidget(hdr)
         root.addWidget(_spacer(6))
         root.addLayout(body, 1)
@@ -123,88 +278,54 @@ class SiteDialog(QDialog):
         self.btn_dup.clicked.connect(self._on_duplicate_selected)
         self.btn_del.clicked.connect(self._on_delete_selected)
 
-        # Keyboard Delete and custom row highlight
+        # Keyboard Delete
         self._orig_keypress = self.tbl.keyPressEvent
         self.tbl.keyPressEvent = self._table_keypress
-        self.tbl.currentCellChanged.connect(self._on_current_cell_changed)
-        self._last_sel_row: int = -1
 
         # Data
         self._catalog = []
         self._catalog_by_id = {}
+        self._catalog_price_cents = {}
+        self._catalog_name_by_id = {}
+        self._catalog_id_by_name = {}
+        self._catalog_row_by_name = {}
+        self._catalog_model = QStandardItemModel(self)
         self._load_obj()
         self._load_catalog()
         self._load_services()
 
-        # Style
+        # Style: applied on first show, once every child exists (one polish pass;
+        # none at all for a dialog built only to read values())
         self.setMinimumWidth(720)
-        self._apply_style()
+        self._styled = False
+
+    def showEvent(self, e):
+        if not self._styled:
+            self._styled = True
+            self._apply_style()
+        super().showEvent(e)
 
     # ---------- Style (match CustomerDialog and improve selection contrast)
     def _apply_style(self):
-        self.setStyleSheet("""
-        QLabel#dlgTitle { font-size: 18px; font-weight: 600; padding-left: 8px; }
-        QGroupBox { font-weight: 600; }
-        QLineEdit, QTextEdit, QComboBox { padding: 6px; }
-
-        /* Default item selection colors for tables */
-        QTableView::item:selected { background: #e5f3ff; color: #111111; }
-        QHeaderView::section {
-            font-weight: 600;
-            background: #f8fafc;
-            border: 1px solid #e5e7eb;
-            padding: 4px 6px;
-        }
-        QPushButton { padding: 6px 12px; }
-
-        /* Highlight cells that are widgets on the selected row */
-        QComboBox[rowSelected="1"],
-        QDoubleSpinBox[rowSelected="1"],
-        QCheckBox[rowSelected="1"] {
-            background: #e5f3ff;
-        }
-        """)
-
-    # ---------- Row highlight for widget cells
-    def _on_current_cell_changed(self, cur_row, cur_col, prev_row, prev_col):
-        if prev_row is not None and prev_row >= 0:
-            self._set_row_selected(prev_row, False)
-        if cur_row is not None and cur_row >= 0:
-            self._set_row_selected(cur_row, True)
-        self._last_sel_row = cur_row
-
-    def _set_row_selected(self, row: int, sel: bool):
-        # Set a dynamic property so QSS above can color the widgets
-        for c in range(3):
-            w = self.tbl.cellWidget(row, c)
-            if w:
-                w.setProperty("rowSelected", "1" if sel else "0")
-                w.style().unpolish(w); w.style().polish(w)
+        self.setStyleSheet(self._STYLE)
 
     # ---------- Actions
     def _on_add_custom(self):
-        self._append_row(active=True, name="Custom Service", price_dollars=0.00, service_id=None, catalog_id=None)
+        self._append_row(active=True, name="Custom Service", price_cents=0, service_id=None, catalog_id=None)
 
     def _on_duplicate_selected(self):
-        r = self.tbl.currentRow()
+        r = self.tbl.currentIndex().row()
         if r < 0: return
-        chk: QCheckBox = self.tbl.cellWidget(r, 0)
-        cmb: QComboBox = self.tbl.cellWidget(r, 1)
-        spn: QDoubleSpinBox = self.tbl.cellWidget(r, 2)
-        active = bool(chk.isChecked()) if chk else True
-        name = cmb.currentText().strip() if cmb else "Service"
-        price = float(spn.value()) if spn else 0.0
-        cat_id = cmb.currentData() if cmb else None
-        self._append_row(active=active, name=name, price_dollars=price, service_id=None, catalog_id=cat_id)
+        src = self.model.rows[r]
+        self._append_row(active=src.active, name=src.name, price_cents=src.price_cents,
+                         service_id=None, catalog_id=src.catalog_id)
 
     def _on_delete_selected(self):
-        r = self.tbl.currentRow()
+        r = self.tbl.currentIndex().row()
         if r < 0: return
-        it_hidden = self.tbl.item(r, 0)
-        svc_id = it_hidden.data(Qt.UserRole) if it_hidden else None
-        if svc_id:
-            self._deleted_ids.append(int(svc_id))
-        self.tbl.removeRow(r)
+        row = self.model.remove(r)
+        if row.service_id:
+            self._deleted_ids.append(int(row.service_id))
 
     def _table_keypress(self, event):
         if event.key() in (Qt.Key_Delete, Qt.Key_Backspace):
@@ -216,16 +337,13 @@ class SiteDialog(QDialog):
             QMessageBox.information(self, "Catalog", "No catalog services available. Add some in Catalog Manager.")
             return
         self._safe_rollback_if_needed()
+        # imported on first Pick, not with the dialog module (sys.modules caches it after)
+        from .catalog_picker import CatalogPickerDialog
         try:
             dlg = CatalogPickerDialog(self, repo=self._repo)
         except TypeError:
             dlg = CatalogPickerDialog(self)
 
-        # Force readable selected text in the picker
-        dlg.setStyleSheet("""
-            QTableView::item:selected { background: #e5f3ff; color: #111111; }
-        """)
-
         if dlg.exec():
             ids = []
             if hasattr(dlg, "selected_ids"):
@@ -233,16 +351,16 @@ class SiteDialog(QDialog):
                 except Exception: ids = []
             elif hasattr(dlg, "selected"):
                 ids = dlg.selected()
-            for cid in ids:
-                cat = self._catalog_by_id.get(cid)
-                if not cat: continue
-                self._append_row(
-                    active=True,
-                    name=getattr(cat, "name", "Service") or "Service",
-                    price_dollars=_to_dollars(getattr(cat, "default_price_cents", 0)),
-                    service_id=None,
-                    catalog_id=cid,
-                )
+            # rows straight from the precomputed catalog dicts (picked ids are catalog
+            # ids, so no name re-link through _make_row), one rowsInserted for the pick
+            names, prices = self._catalog_name_by_id, self._catalog_price_cents
+            picked = [
+                _SvcRow(active=True, name=names[cid] or "Service", price_cents=prices[cid], catalog_id=cid)
+                for cid in ids if cid in names
+            ]
+            if picked:
+                self.model.extend(picked)
+                self._select_first_row()
 
     # ---------- Data loading
     def _load_obj(self):
@@ -252,7 +370,8 @@ class SiteDialog(QDialog):
         self.poc_name.setText(self._obj.poc_name or "")
         self.poc_phone.setText(self._obj.poc_phone or "")
         self.poc_email.setText(self._obj.poc_email or "")
-        self.cadence.setCurrentText(self._obj.cadence_text or "")
+        # dict lookup instead of the combo's findText scan; unknown text keeps the blank entry
+        self.cadence.setCurrentIndex(_CADENCE_INDEX.get(self._obj.cadence_text or "", 0))
         self.notes.setPlainText(self._obj.notes or "")
 
     def _load_catalog(self):
@@ -263,176 +382,128 @@ class SiteDialog(QDialog):
         except Exception:
             self._catalog = []
         self._catalog_by_id = {c.id: c for c in self._catalog}
+        # plain lookups for the edit/save paths (no getattr or defaults per call)
+        self._catalog_price_cents = {c.id: int(getattr(c, "default_price_cents", 0) or 0) for c in self._catalog}
+        self._catalog_name_by_id = {c.id: (getattr(c, "name", None) or "") for c in self._catalog}
+        self._catalog_id_by_name = {c.name: c.id for c in self._catalog}
+        self._catalog_row_by_name = {c.name: i for i, c in enumerate(self._catalog)}
+        # one item model for every Service editor instead of addItem per entry per edit;
+        # refilled with one reset and one rowsInserted, not an insert per entry
+        items = []
+        for c in self._catalog:
+            it = QStandardItem(c.name)
+            it.setData(c.id, Qt.UserRole)
+            items.append(it)
+        self._catalog_model.clear()
+        self._catalog_model.invisibleRootItem().appendRows(items)
 
     def _load_services(self):
-        self.tbl.setRowCount(0)
-        if not (self._repo and self._obj and getattr(self._obj, "id", None)):
+        # cheap guards first: a new site has nothing to load, so no rollback or try
+        if self._obj is None or self._repo is None:
+            return
+        site_id = getattr(self._obj, "id", None)
+        if not site_id:
             return
         self._safe_rollback_if_needed()
         try:
             try:
-                rows = self._repo.list_services_for_site(self._obj.id, active_only=True)
+                rows = self._repo.list_services_for_site(site_id, active_only=True)
             except TypeError:
-                rows = self._repo.list_services_for_site(self._obj.id)
+                rows = self._repo.list_services_for_site(site_id)
                 rows = [s for s in rows if bool(getattr(s, "active", True))]
-            for s in rows:
-                self._append_row(
-                    active=bool(getattr(s, "active", True)),
-                    name=(s.name or ""),
-                    price_dollars=_to_dollars(getattr(s, "unit_price_cents", 0)),
-                    service_id=s.id,
-                    catalog_id=getattr(s, "catalog_id", None),
-                )
         except Exception:
-            pass
+            return
+        # one model reset for the whole list
+        self.model.set_rows([
+            self._make_row(
+                active=bool(getattr(s, "active", True)),
+                name=(s.name or ""),
+                price_cents=getattr(s, "unit_price_cents", 0),
+                service_id=s.id,
+                catalog_id=getattr(s, "catalog_id", None),
+            )
+            for s in rows
+        ])
+        self._select_first_row()
 
     # ---------- Row helpers
-    def _append_row(self, *, active: bool, name: str, price_dollars: float,
-                    service_id: Optional[int], catalog_id: Optional[int]):
-        r = self.tbl.rowCount()
-        self.tbl.insertRow(r)
-
-        chk = QCheckBox(); chk.setChecked(active)
-        self.tbl.setCellWidget(r, 0, chk)
+    def _make_row(self, *, active: bool, name: str, price_cents: int,
+                  service_id: Optional[int], catalog_id: Optional[int]) -> _SvcRow:
+        # a name that matches a catalog entry links to it, as picking it would
+        return _SvcRow(
+            active=bool(active),
+            name=name or "Custom Service",
+            price_cents=int(price_cents or 0),
+            service_id=service_id,
+            catalog_id=self._catalog_id_by_name.get(name, catalog_id),
+        )
 
-        cmb = QComboBox(); cmb.setEditable(True)
-        for c in self._catalog:
-            cmb.addItem(c.name, c.id)
-        idx = cmb.findText(name, Qt.MatchExactly)
-        if idx < 0:
-            cmb.addItem(name or "Custom Service", None)
-            idx = cmb.count() - 1
-        cmb.setCurrentIndex(idx)
-        self.tbl.setCellWidget(r, 1, cmb)
-
-        spn = QDoubleSpinBox()
-        spn.setRange(0.00, 999999.00)
-        spn.setDecimals(2)
-        spn.setSingleStep(1.00)
-        spn.setValue(price_dollars)
-        spn.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.tbl.setCellWidget(r, 2, spn)
-
-        # hidden ids stored in col 0 and 1 items
-        self.tbl.setItem(r, 0, self._mk_hidden(service_id))
-        self.tbl.setItem(r, 1, self._mk_hidden(catalog_id))
-
-        def on_changed(_idx, row=r):
-            self._row_service_changed(row)
-        cmb.currentIndexChanged.connect(on_changed)
-
-        # If this is the first row added, move selection to it to show highlight
-        if self.tbl.currentRow() == -1 and r == 0:
-            self.tbl.setCurrentCell(0, 1)
-
-    def _row_service_changed(self, row: int):
-        cmb: QComboBox = self.tbl.cellWidget(row, 1)
-        spn: QDoubleSpinBox = self.tbl.cellWidget(row, 2)
-        if not cmb or not spn: return
-        selected_cat_id = cmb.currentData()
-        it_hidden = self.tbl.item(row, 1)
-        if it_hidden:
-            it_hidden.setData(Qt.UserRole, selected_cat_id)
-        if selected_cat_id is None: return
-        cat = self._catalog_by_id.get(selected_cat_id)
-        if not cat: return
-        spn.setValue(_to_dollars(getattr(cat, "default_price_cents", 0)))
-
-    def _mk_hidden(self, val):
-        it = QTableWidgetItem(str(val) if val is not None else "")
-        it.setFlags(Qt.ItemIsEnabled)
-        it.setData(Qt.UserRole, val)
-        it.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        return it
+    def _append_row(self, *, active: bool, name: str, price_cents: int,
+                    service_id: Optional[int], catalog_id: Optional[int]):
+        self.model.append(self._make_row(active=active, name=name, price_cents=price_cents,
+                                         service_id=service_id, catalog_id=catalog_id))
+        self._select_first_row()
+
+    def _select_first_row(self):
+        # put the highlight on the first row once there is one
+        if not self.tbl.currentIndex().isValid() and self.model.rows:
+            self.tbl.setCurrentIndex(self.model.index(0, 1))
+
+    def _set_row_service(self, row: int, name: str, catalog_id: Optional[int]):
+        """Service cell edit: picking a different catalog entry also resets the price."""
+        r = self.model.rows[row]
+        changed = r.catalog_id != catalog_id
+        r.name = name or "Custom Service"
+        r.catalog_id = catalog_id
+        if changed and catalog_id in self._catalog_price_cents:
+            r.price_cents = self._catalog_price_cents[catalog_id]
+        self.model.row_changed(row)
 
     # ---------- Extraction and persist
     def _safe_display_name(self, catalog_id: Optional[int], raw_name: str) -> str:
+        name = self._catalog_name_by_id.get(catalog_id)
+        if name:
+            return name
         raw = (raw_name or "").strip()
-        if catalog_id is not None:
-            cat = self._catalog_by_id.get(catalog_id)
-            if cat and getattr(cat, "name", None):
-                return cat.name
         return raw if raw else "Service"
 
-    def _extract_row_values(self, row: int) -> dict:
-        chk: QCheckBox = self.tbl.cellWidget(row, 0)
-        cmb: QComboBox = self.tbl.cellWidget(row, 1)
-        spn: QDoubleSpinBox = self.tbl.cellWidget(row, 2)
-
-        item_svc = self.tbl.item(row, 0)
-        item_cat = self.tbl.item(row, 1)
-        service_id = item_svc.data(Qt.UserRole) if item_svc else None
-        catalog_id = item_cat.data(Qt.UserRole) if item_cat else None
-
-        chosen_cat_id = cmb.currentData() if cmb else None
-        if chosen_cat_id is not None:
-            catalog_id = chosen_cat_id
-
-        raw_name = (cmb.currentText().strip() if cmb else "")
-        safe_name = self._safe_display_name(catalog_id, raw_name)
-
-        active = bool(chk.isChecked()) if chk else True
-        price_cents = _to_cents(spn.value() if spn else 0.0)
-
+    def _extract_row_values(self, row: _SvcRow) -> dict:
+        # model rows already hold int cents and ids, so this is just the column mapping
         return dict(
-            service_id=int(service_id) if service_id is not None else None,
-            catalog_id=int(catalog_id) if catalog_id is not None else None,
-            name=safe_name,
-            price_cents=price_cents,
-            active=active,
+            name=self._safe_display_name(row.catalog_id, row.name),
+            catalog_id=row.catalog_id,
+            unit_price_cents=row.price_cents,
+            active=row.active,
         )
 
     def _safe_rollback_if_needed(self):
-        try:
-            s = getattr(self._repo, "s", None)
-            if s is not None:
+        s = self._session
+        if s is not None:
+            try:
                 s.rollback()
-        except Exception:
-            pass
+            except Exception:
+                pass
 
     def _persist_services(self):
-        if not (self._repo and self._obj and getattr(self._obj, "id", None)):
+        if self._obj is None or self._repo is None:
+            return
+        site_id = getattr(self._obj, "id", None)
+        if not site_id:
             return
-
-        site_id = int(self._obj.id)
         self._safe_rollback_if_needed()
 
         try:
-            # Upsert visible rows
-            for r in range(self.tbl.rowCount()):
-                vals = self._extract_row_values(r)
-                if vals["service_id"]:
-                    self._repo.update_site_service(
-                        vals["service_id"],
-                        name=vals["name"],
-                        catalog_id=vals["catalog_id"],
-                        unit_price_cents=vals["price_cents"],
-                        active=vals["active"],
-                    )
+            # one pass over the rows; inserts ignore "active" (new rows start active)
+            updates, inserts = [], []
+            for row in self.model.rows:
+                v = self._extract_row_values(row)
+                if row.service_id:
+                    updates.append((row.service_id, v))
                 else:
-                    self._repo.add_service_to_site(
-                        site_id,
-                        name=vals["name"],
-                        catalog_id=vals["catalog_id"],
-                        unit_price_cents=vals["price_cents"],
-                    )
-
-            # Apply removals last
-            for svc_id in self._deleted_ids:
-                if hasattr(self._repo, "delete_site_service"):
-                    try:
-                        self._repo.delete_site_service(int(svc_id))
-                        continue
-                    except Exception:
-                        pass
-                self._repo.update_site_service(int(svc_id), active=False)
+                    inserts.append(v)
+            # one DELETE, one UPDATE and one INSERT, committed together
+            self._repo.sync_site_services(site_id, updates, inserts, self._deleted_ids)
             self._deleted_ids.clear()
-
-            s = getattr(self._repo, "s", None)
-            if s is not None:
-                s.flush()
-                s.commit()
-
         except Exception as e:
             self._safe_rollback_if_needed()
             QMessageBox.critical(
@@ -443,43 +514,39 @@ class SiteDialog(QDialog):
             raise
 
     # ---------- Save + values
+    def _collect_core_fields(self) -> dict:
+        """Stripped site fields, keyed by their Site attribute names."""
+        return dict(
+            name=self.site_name.text().strip(),
+            address=self.address.toPlainText().strip(),
+            poc_name=self.poc_name.text().strip(),
+            poc_phone=self.poc_phone.text().strip(),
+            poc_email=self.poc_email.text().strip(),
+            cadence_text=self.cadence.currentText().strip(),
+            notes=self.notes.toPlainText().strip(),
+        )
+
     def _on_save(self):
-        if not self.site_name.text().strip():
+        fields = self._collect_core_fields()
+        if not fields["name"]:
             QMessageBox.warning(self, "Missing", "Site name is required.")
             self.site_name.setFocus(); return
         try:
             if self._obj is not None:
-                self._obj.name = self.site_name.text().strip()
-                self._obj.address = self.address.toPlainText().strip()
-                self._obj.poc_name = self.poc_name.text().strip()
-                self._obj.poc_phone = self.poc_phone.text().strip()
-                self._obj.poc_email = self.poc_email.text().strip()
-                self._obj.cadence_text = self.cadence.currentText().strip()
-                self._obj.notes = self.notes.toPlainText().strip()
+                for attr, value in fields.items():
+                    setattr(self._obj, attr, value)
             self._persist_services()
         except Exception:
             return
         self.accept()
 
     def values(self) -> dict:
-        vals = dict(
-            name=self.site_name.text().strip(),
-            address=self.address.toPlainText().strip(),
-            poc_name=self.poc_name.text().strip(),
-            poc_phone=self.poc_phone.text().strip(),
-            poc_email=self.poc_email.text().strip(),
-            cadence_text=self.cadence.currentText().strip(),
-            notes=self.notes.toPlainText().strip(),
-        )
+        vals = self._collect_core_fields()
         if not getattr(self, "_obj", None):
             selected: List[str] = []
-            for r in range(self.tbl.rowCount()):
-                chk = self.tbl.cellWidget(r, 0)
-                if chk and chk.isChecked():
-                    cmb = self.tbl.cellWidget(r, 1)
-                    raw = (cmb.currentText().strip() if cmb else "")
-                    cat_id = cmb.currentData() if cmb else None
-                    name = self._safe_display_name(cat_id, raw)
+            for row in self.model.rows:
+                if row.active:
+                    name = self._safe_display_name(row.catalog_id, row.name)
                     if name:
                         selected.append(name)
             vals["services_selected_names"] = selected
@@ -3,25 +3,76 @@ from __future__ import annotations
 # -*- coding: utf-8 -*-
 
 from typing import Optional
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QTimer, QAbstractListModel, QModelIndex
+from PySide6.QtGui import QColor
 from PySide6.QtWidgets import (
-    QDialog, QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QLineEdit,
+    QDialog, QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QListView, QLineEdit,
     QLabel, QPushButton, QFormLayout, QComboBox, QCheckBox, QMessageBox
 )
 
 # Expects repo helpers:
-#   - Repo.list_employees(active_only=True/False)
+#   - Repo.list_employees(active_only=True/False, search=None, limit=None)
+#   - Repo.get_employee(emp_id)
 #   - Repo.create_employee(...)
 #   - Repo.update_employee(emp_id, **kwargs)
 #   - Repo.delete_employee(emp_id)
 #   - Repo.list_assignments_for_so(so_id)
-#   - Repo.assign_employee(so_id, emp_id, role="Primary")
-#   - Repo.unassign_employee(so_id, emp_id)
+#   - Repo.sync_assignments(so_id, employee_ids)
 
 
 # ----------------------------
 # Employee Manager Dialog
 # ----------------------------
+_INACTIVE_FG = QColor(Qt.gray)
+_LIST_LIMIT = 200   # most employees the manager list holds; past that, narrow the search
+_MORE_LINE = "… more staff match; narrow your search …"
+
+
+class _EmployeeListModel(QAbstractListModel):
+    """
+    'Name  |  Role  |  Phone' lines with the employee id on Qt.UserRole; inactive
+    employees are greyed. The view only asks for the rows it shows. A row with
+    id None is a disabled note (the truncation hint), never an employee.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lines: list[str] = []
+        self._ids: list[Optional[int]] = []
+        self._active: list[bool] = []
+        self._row_by_id: dict[int, int] = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._lines)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        r = index.row()
+        if role == Qt.DisplayRole:
+            return self._lines[r]
+        if role == Qt.UserRole:
+            return self._ids[r]
+        if role == Qt.ForegroundRole and not self._active[r]:
+            return _INACTIVE_FG
+        return None
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid() or self._ids[index.row()] is None:
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+    def set_rows(self, rows: list[tuple[str, Optional[int], bool]]):
+        self.beginResetModel()
+        self._lines = [line for line, _, _ in rows]
+        self._ids = [eid for _, eid, _ in rows]
+        self._active = [active for _, _, active in rows]
+        self._row_by_id = {eid: i for i, eid in enumerate(self._ids) if eid is not None}
+        self.endResetModel()
+
+    def row_of(self, emp_id: int) -> Optional[int]:
+        return self._row_by_id.get(emp_id)
+
+
 class EmployeeManagerDialog(QDialog):
     """
     Simple CRUD for employees.
@@ -40,7 +91,10 @@ class EmployeeManagerDialog(QDialog):
         sheck = True
         self.chk_active_only.setChecked(True)
 
-        self.list = QListWidget()
+        self.model = _EmployeeListModel(self)
+        self.list = QListView()
+        self.list.setModel(self.model)
+        self.list.setUniformItemSizes(True)  # one line per employee: no per-row size hints
         self.list.setMinimumWidth(260)
 
         left = QWidget()
@@ -89,9 +143,14 @@ class EmployeeManagerDialog(QDialog):
         root.addWidget(right, 2)
 
         # ---- Signals ----
-        self.search.textChanged.connect(self._populate)
+        # debounce: a burst of keystrokes runs one employee query
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self._populate)
+        self.search.textChanged.connect(self._search_timer.start)
         self.chk_active_only.toggled.connect(self._populate)
-        self.list.currentItemChanged.connect(self._on_select)
+        self.list.selectionModel().currentChanged.connect(self._on_select)
         self.btn_new.clicked.connect(self._new)
         self.btn_save.clicked.connect(self._save)
         self.btn_delete.clicked.connect(self._delete)
@@ -99,71 +158,82 @@ class EmployeeManagerDialog(QDialog):
 
         # ---- State ----
         self._current_id: Optional[int] = None
+        # unfiltered list lines per Active-only state; dropped on save/delete
+        self._snap_active: Optional[list[tuple[str, Optional[int], bool]]] = None
+        self._snap_all: Optional[list[tuple[str, Optional[int], bool]]] = None
         self._populate()
 
     # --- helpers ---
     def _populate(self):
-        self.list.clear()
+        # a direct refresh (toggle, save, delete) covers any search still pending
+        self._search_timer.stop()
         if not self.repo:
+            self.model.set_rows([])
             return
         query = (self.search.text() or "").strip().lower()
         active_only = self.chk_active_only.isChecked()
+        if query:
+            lines = self._query_lines(active_only, query)
+        elif active_only:
+            if self._snap_active is None:
+                self._snap_active = self._query_lines(True, None)
+            lines = self._snap_active
+        else:
+            if self._snap_all is None:
+                self._snap_all = self._query_lines(False, None)
+            lines = self._snap_all
+        self.model.set_rows(lines)
+
+        # clear the form if list no longer contains current item
+        self._maybe_clear_if_missing()
+
+    def _query_lines(self, active_only: bool, query: Optional[str]) -> list[tuple[str, Optional[int], bool]]:
         try:
-            rows = self.repo.list_employees(active_only=active_only)
+            # filtered and capped in SQL: only matching employees reach the model
+            # (one extra row tells whether more exist past the cap)
+            rows = self.repo.list_employees(active_only=active_only, search=query, limit=_LIST_LIMIT + 1)
         except Exception:
             rows = []
 
-        for e in rows:
+        lines = []
+        for e in rows[:_LIST_LIMIT]:
             txt = f"{e.name}  |  {e.role}"
             if e.phone:
                 txt += f"  |  {e.phone}"
-            item = QListWidgetItem(txt)
-            item.setData(Qt.UserRole, e.id)
             # visually show inactive if not filtered
-            if not e.active:
-                item.setForeground(Qt.gray)
-            self.list.addItem(item)
-
-        # clear the form if list no longer contains current item
-        self._maybe_clear_if_missing()
+            lines.append((txt, e.id, bool(e.active)))
+        if len(rows) > _LIST_LIMIT:
+            lines.append((_MORE_LINE, None, True))
+        return lines
 
-        # basic search filter (client-side)
-        if query:
-            # hide by removing non-matching items
-            for i in reversed(range(self.list.count())):
-                it = self.list.item(i)
-                if query not in it.text().lower():
-                    self.list.takeItem(i)
+    def _invalidate_snapshots(self):
+        self._snap_active = None
+        self._snap_all = None
 
     def _maybe_clear_if_missing(self):
+        # the model reset dropped the view's current row: restore it, or clear the form
         if self._current_id is None:
             return
-        ids = [self.list.item(i).data(Qt.UserRole) for i in range(self.list.count())]
-        if self._current_id not in ids:
+        row = self.model.row_of(self._current_id)
+        if row is None:
+            self._current_id = None
             self._clear_form()
+        else:
+            self.list.setCurrentIndex(self.model.index(row))
 
-    def _on_select(self, cur: QListWidgetItem, prev: QListWidgetItem):
-        if not cur:
+    def _on_select(self, cur: QModelIndex, prev: QModelIndex):
+        emp_id = cur.data(Qt.UserRole) if cur.isValid() else None
+        if emp_id is None:
             self._current_id = None
             self._clear_form()
             return
-        emp_id = int(cur.data(Qt.UserRole))
+        emp_id = int(emp_id)
         self._current_id = emp_id
-        # fetch fresh via repo session
-        e = None
+        # one primary-key lookup (identity map first) instead of listing every employee
         try:
-            # try direct get using the mapped class from list
-            rows = self.repo.list_employees(active_only=False)
-            if rows:
-                e = self.repo.s.get(type(rows[0]), emp_id)
+            e = self.repo.get_employee(emp_id)
         except Exception:
             e = None
-        if e is None:
-            # fallback: search rows
-            for row in self.repo.list_employees(active_only=False):
-                if row.id == emp_id:
-                    e = row
-                    break
         if not e:
             self._clear_form()
             return
@@ -202,20 +272,12 @@ class EmployeeManagerDialog(QDialog):
                 self._current_id = e.id
             else:
                 self.repo.update_employee(self._current_id, **vals)
+            self._invalidate_snapshots()
+            # _populate re-selects _current_id (now also set for a new employee)
             self._populate()
-            self._select_by_id(self._current_id)
         except Exception as ex:
             QMessageBox.critical(self, "Save Failed", str(ex))
 
-    def _select_by_id(self, emp_id: Optional[int]):
-        if emp_id is None:
-            return
-        for i in range(self.list.count()):
-            it = self.list.item(i)
-            if int(it.data(Qt.UserRole)) == emp_id:
-                self.list.setCurrentRow(i)
-                break
-
     def _delete(self):
         if self._current_id is None:
             QMessageBox.information(self, "Select", "Pick a staff member first.")
@@ -225,6 +287,7 @@ class EmployeeManagerDialog(QDialog):
             return
         try:
             self.repo.delete_employee(self._current_id)
+            self._invalidate_snapshots()
             self._current_id = None
             self._populate()
         except Exception as ex:
@@ -249,6 +312,9 @@ class AssignStaffDialog(QDialog):
         self.setWindowTitle("Assign Staff")
         self.repo = repo
         self.so_id = int(so_id) if so_id is not None else None
+        self._last_assigned_ids: set[int] = set()
+        self._emps_key: list[tuple[int, str, str]] = []     # (id, name, role) as listed
+        self._items_by_id: dict[int, QListWidgetItem] = {}
 
         # Left column: checkable list of employees
         self.list = QListWidget()
@@ -287,8 +353,9 @@ class AssignStaffDialog(QDialog):
         self._populate()
 
     def _populate(self):
-        self.list.clear()
         if not (self.repo and self.so_id):
+            self.list.clear()
+            self._emps_key, self._items_by_id = [], {}
             return
         # active employees
         try:
@@ -305,55 +372,50 @@ class AssignStaffDialog(QDialog):
         except Exception:
             pass
 
-        for e in emps:
-            item = QListWidgetItem(f"{e.name}  |  {e.role}")
-            item.setData(Qt.UserRole, int(e.id))
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked if int(e.id) in assigned_ids else Qt.Unchecked)
-            self.list.addItem(item)
-
-        self.lbl_info.setText(f"Active employees: {self.list.count()}  |  Assigned: {len(assigned_ids)}")
+        key = [(int(e.id), e.name, e.role) for e in emps]
+        if key == self._emps_key:
+            # same employees as shown: only the check states can differ
+            for emp_id, item in self._items_by_id.items():
+                state = Qt.Checked if emp_id in assigned_ids else Qt.Unchecked
+                if item.checkState() != state:
+                    item.setCheckState(state)
+        else:
+            self.list.clear()
+            self._items_by_id = {}
+            for emp_id, name, role in key:
+                item = QListWidgetItem(f"{name}  |  {role}")
+                item.setData(Qt.UserRole, emp_id)
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Checked if emp_id in assigned_ids else Qt.Unchecked)
+                self.list.addItem(item)
+                self._items_by_id[emp_id] = item
+            self._emps_key = key
+
+        # what the checkboxes were seeded from; _apply diffs against it
+        self._last_assigned_ids = assigned_ids
+        self._update_info()
+
+    def _update_info(self):
+        self.lbl_info.setText(f"Active employees: {self.list.count()}  |  Assigned: {len(self._last_assigned_ids)}")
 
     def _apply(self):
-        """Unassign anyone unchecked, then assign all checked."""
+        """Make the SO's staff exactly the checked employees (one repo transaction)."""
         if not (self.repo and self.so_id):
             return
 
         # Gather checked employee ids
-        checked_ids = set()
-        for i in range(self.list.count()):
-            it = self.list.item(i)
-            if it.checkState() == Qt.Checked:
-                checked_ids.add(int(it.data(Qt.UserRole)))
+        checked_ids = {emp_id for emp_id, it in self._items_by_id.items() if it.checkState() == Qt.Checked}
 
-        errs = []
-
-        # Unassign all that are currently assigned but unchecked
-        try:
-            current = self.repo.list_assignments_for_so(self.so_id)
-        except Exception as ex:
-            current = []
-            errs.append(str(ex))
-
-        for a in current:
-            if int(a.employee_id) not in checked_ids:
-                try:
-                    self.repo.unassign_employee(self.so_id, int(a.employee_id))
-                except Exception as ex:
-                    errs.append(str(ex))
-
-        # Assign all checked ids
-        for emp_id in sorted(checked_ids):
+        # nothing toggled since the last load: no transaction at all
+        if checked_ids != self._last_assigned_ids:
             try:
-                # accept extra kwargs but they are optional in Repo
-                self.repo.assign_employee(self.so_id, emp_id, role="Primary")
+                self.repo.sync_assignments(self.so_id, checked_ids)
             except Exception as ex:
-                errs.append(str(ex))
-
-        if errs:
-            QMessageBox.warning(self, "Partial Success", "Some changes failed:\n" + "\n".join(errs))
-            self._populate()
-            return
+                QMessageBox.critical(self, "Save Failed", f"Staff assignments were not changed:\n{ex}")
+                self._populate()
+                return
+            # the checkboxes already show the saved state; no need to re-query both lists
+            self._last_assigned_ids = checked_ids
+            self._update_info()
 
         QMessageBox.information(self, "Saved", "Staff assignments updated.")
-        self._populate()
@@ -12,7 +12,7 @@ from PySide6.QtCore import Qt, QDate, QTimer
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QTextEdit,
-    QLabel, QPushButton, QDateEdit, QDoubleSpinBox, QTableWidget, QTableWidgetItem,
+    QLabel, QPushButton, QDateEdit, QDoubleSpinBox, QTableWidget,
     QAbstractItemView, QMessageBox, QWidget, QSplitter, QApplication, QHeaderView
 )
 
@@ -21,6 +21,7 @@ from invoice_template_export import export_template_pdf_for_so, suggest_pdf_name
 
 # PDF preview
 from ui.pdf_preview_silent2 import SilentPdfPreview
+from ui.dialogs.common import _fill_money_rows
 
 
 def _project_root() -> str:
@@ -50,7 +51,7 @@ def _attachments_dir_for_so(so_id: int) -> str:
     return path
 
 
-@dataclass
+@dataclass(slots=True)  # no per-instance __dict__; fields are fixed
 class _Seed:
     invoice_no: str
     invoice_date: date
@@ -62,10 +63,6 @@ class _Seed:
     bill_to_contact: str
 
 
-def _to_dollars(cents: int) -> float:
-    return round((cents or 0) / 100.0, 2)
-
-
 # ---------- auto note helpers ----------
 _AUTO_TAG = "[AutoNote]:"
 
@@ -268,12 +265,7 @@ class InvoiceDialog(QDialog):
         )
 
         self.tbl.setRowCount(0)
-        for desc, cents in self._seed.line_items_cents:
-            r = self.tbl.rowCount(); self.tbl.insertRow(r)
-            self.tbl.setItem(r, 0, QTableWidgetItem(desc or "Service"))
-            itp = QTableWidgetItem(f"{_to_dollars(cents):.2f}")
-            itp.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.tbl.setItem(r, 1, itp)
+        _fill_money_rows(self.tbl, self._seed.line_items_cents)
 
     # ---------- helpers ----------
     def _debounced_refresh(self):
@@ -1,10 +1,11 @@
 from __future__ import annotations
 from datetime import date, datetime, timedelta
 from typing import Optional, Iterable, List
+import functools
 import os
 import json
 
-from PySide6.QtCore import Qt, QSortFilterProxyModel, QRegularExpression, QModelIndex
+from PySide6.QtCore import Qt, QSortFilterProxyModel, QRegularExpression, QModelIndex, QTimer
 from PySide6.QtGui import QPixmap, QIcon, QAction
 from PySide6.QtWidgets import (
     QWidget, QMainWindow, QSplitter, QListWidget, QListWidgetItem, QVBoxLayout, QHBoxLayout,
@@ -16,7 +17,7 @@ from sqlalchemy import select
 from repository import Repo
 from models import Customer, Site, ServiceOrder
 from .dialogs import CustomerDialog, SiteDialog, ServiceOrderDialog, CustomerSiteDetailsDialog
-from .widgets import SoTable, SoTableModel
+from .widgets import SoTable, SoTableModel, SoRowTableModel
 from ui.invoice_dialog import InvoiceDialog
 # Staff dialogs
 from .employee_dialogs import EmployeeManagerDialog, AssignStaffDialog
@@ -246,22 +247,17 @@ class MainWindow(QMainWindow):
         else:
             rows = self._query_open_company()
 
-        self._set_center_model(SoTableModel(rows))
-        try:
-            self.table_site_sos.setSortingEnabled(True)
-            # Scheduled column should be index 0 in SoTableModel
-            self.table_site_sos.sortByColumn(0, Qt.AscendingOrder)
-        except Exception:
-            pass
+        # Scheduled column should be index 0 in SoTableModel
+        self._set_center_model(SoTableModel(rows), sort_column=0)
 
     # -----------------------------
     # Refresh helpers
     # -----------------------------
     def _refresh_customers(self):
         self.list_customers.clear()
-        for c in self.repo.list_customers():
-            item = QListWidgetItem(c.name)
-            item.setData(Qt.UserRole, c.id)
+        for c in self.repo.list_customer_rows():
+            item = QListWidgetItem(c["name"])
+            item.setData(Qt.UserRole, c["id"])
             self.list_customers.addItem(item)
 
     def _refresh_sites(self, customer_id: Optional[int]):
@@ -270,13 +266,13 @@ class MainWindow(QMainWindow):
         self._update_invoice_actions_state()
         if not customer_id:
             return
-        for s in self.repo.list_sites_for_customer(customer_id):
-            item = QListWidgetItem(s.name)
-            item.setData(Qt.UserRole, s.id)
+        for s in self.repo.list_site_rows_for_customer(customer_id):
+            item = QListWidgetItem(s["name"])
+            item.setData(Qt.UserRole, s["id"])
             self.list_sites.addItem(item)
 
     def _filtered_month_rows(self):
-        rows = self.repo.list_sos_due_in_month(self._year, self._month)
+        rows = self.repo.list_calendar_rows(self._year, self._month)
         if self._month_filter == 1:
             today = date.today()
             rows = [r for r in rows if (r.scheduled_date == today and not r.completed)]
@@ -290,7 +286,7 @@ class MainWindow(QMainWindow):
 
     def _refresh_month(self):
         self.lbl_month.setText(f"{self._year}-{self._month:02d}")
-        self.table_month.setModel(SoTableModel(self._filtered_month_rows()))
+        self.table_month.reset_model(SoRowTableModel(self._filtered_month_rows()))
 
     # -----------------------------
     # UI construction
@@ -470,7 +466,8 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(root)
         header.setStyleSheet(header.styleSheet() + "\n#monthLbl { color: %s; font-weight: 600; }" % WHITE)
 
-        # Signals
+        # Signals: connect bound methods (functools.partial for fixed args), not
+        # lambdas or SIGNAL("...") strings
         self.btn_manage_catalog_hdr.clicked.connect(self._manage_catalog)
         self.btn_manage_staff_hdr.clicked.connect(self._manage_staff)
         self.btn_add_customer.clicked.connect(self._add_customer)
@@ -481,9 +478,9 @@ class MainWindow(QMainWindow):
         self.btn_del_so.clicked.connect(self._del_so)
 
         self.btn_assign_staff.clicked.connect(self._assign_staff)
-        self.btn_mark_done.clicked.connect(lambda: self._flag_selected_so(done=True))
+        self.btn_mark_done.clicked.connect(functools.partial(self._flag_selected_so, done=True))
         self.btn_generate_invoice.clicked.connect(self._generate_invoice)
-        self.btn_mark_inv.clicked.connect(lambda: self._flag_selected_so(inv=True))
+        self.btn_mark_inv.clicked.connect(functools.partial(self._flag_selected_so, inv=True))
 
         self.list_customers.currentItemChanged.connect(self._on_customer_changed)
         self.list_customers.itemDoubleClicked.connect(self._edit_customer)
@@ -492,12 +489,17 @@ class MainWindow(QMainWindow):
         self.btn_prev.clicked.connect(self._goto_prev_month)
         self.btn_next.clicked.connect(self._goto_next_month)
         self.btn_this.clicked.connect(self._goto_this_month)
-        self.filter_group.buttonClicked.connect(lambda btn: self._set_month_filter(self.filter_group.id(btn)))
+        self.filter_group.idClicked.connect(self._set_month_filter)
         self.btn_toggle_right.clicked.connect(self._toggle_right_panel)
         self.chk_month_open_only.toggled.connect(self._on_month_open_only_toggled)
 
         self.cmb_status.currentTextChanged.connect(self._on_status_changed)
-        self.txt_search.textChanged.connect(self._on_search_changed)
+        # debounce: a burst of keystrokes re-filters (and saves the pref) once
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self._on_search_changed)
+        self.txt_search.textChanged.connect(self._search_timer.start)
 
         center.setStyleSheet("""
             #centerTitle { font-size: 14px; font-weight: 600; }
@@ -561,7 +563,8 @@ class MainWindow(QMainWindow):
             self._update_center_count()
         self._set_pref("sos_panel", "filter_status", text)
 
-    def _on_search_changed(self, text: str):
+    def _on_search_changed(self):
+        text = self.txt_search.text()
         if hasattr(self, "proxy_site"):
             self.proxy_site.set_text(text)
             self._update_center_count()
@@ -570,7 +573,7 @@ class MainWindow(QMainWindow):
     # -----------------------------
     # Center model wiring
     # -----------------------------
-    def _set_center_model(self, model: SoTableModel):
+    def _set_center_model(self, model: SoTableModel, sort_column: Optional[int] = None):
         self.proxy_site = _SoFilterProxy(self)
         self.proxy_site.setSourceModel(model)
         # Re-apply current filters so switching scope does not reset
@@ -579,7 +582,8 @@ class MainWindow(QMainWindow):
             self.proxy_site.set_text(self.txt_search.text())
         except Exception:
             pass
-        self.table_site_sos.setModel(self.proxy_site)
+        # one sort of the filtered rows (none while the model is being swapped in)
+        self.table_site_sos.reset_model(self.proxy_site, sort_column)
         self._update_center_count()
         self._wire_so_selection_signals()
         self._restore_sos_column_widths()
@@ -587,7 +591,7 @@ class MainWindow(QMainWindow):
             self.table_site_sos.horizontalHeader().sectionResized.disconnect()
         except Exception:
             pass
-        self.table_site_sos.horizontalHeader().sectionResized.connect(lambda *_: self._persist_sos_column_widths())
+        self.table_site_sos.horizontalHeader().sectionResized.connect(self._persist_sos_column_widths)
 
     def _update_center_count(self):
         src: SoTableModel = self.proxy_site.sourceModel() if hasattr(self, "proxy_site") else None
@@ -616,26 +620,27 @@ class MainWindow(QMainWindow):
                 email=(vals.get("email") or "").strip(),
                 notes=(vals.get("notes") or "").strip(),
             )
-            c = self.repo.create_customer(**cust_fields)
-            pp = vals.get("payment_profile") or {}
-            method = (pp.get("method") or "other").lower()
-            if method != "other":
-                prof = self.repo.create_payment_profile(
-                    customer_id=c.id,
-                    method=method,
-                    ach_routing=pp.get("ach_routing", ""),
-                    ach_account=pp.get("ach_account", ""),
-                    card_brand=pp.get("card_brand", ""),
-                    card_last4=pp.get("card_last4", ""),
-                    card_name=pp.get("card_name", ""),
-                    card_exp_month=pp.get("card_exp_month", 0),
-                    card_exp_year=pp.get("card_exp_year", 0),
-                    bill_street=pp.get("bill_street", ""),
-                    bill_city_state_zip=pp.get("bill_city_state_zip", ""),
-                    is_default=bool(pp.get("is_default", True)),
-                )
-                if pp.get("is_default", True):
-                    self.repo.set_default_payment_profile(c.id, prof.id)
+            with self.repo.transaction():
+                c = self.repo.create_customer(**cust_fields)
+                pp = vals.get("payment_profile") or {}
+                method = (pp.get("method") or "other").lower()
+                if method != "other":
+                    prof = self.repo.create_payment_profile(
+                        customer_id=c.id,
+                        method=method,
+                        ach_routing=pp.get("ach_routing", ""),
+                        ach_account=pp.get("ach_account", ""),
+                        card_brand=pp.get("card_brand", ""),
+                        card_last4=pp.get("card_last4", ""),
+                        card_name=pp.get("card_name", ""),
+                        card_exp_month=pp.get("card_exp_month", 0),
+                        card_exp_year=pp.get("card_exp_year", 0),
+                        bill_street=pp.get("bill_street", ""),
+                        bill_city_state_zip=pp.get("bill_city_state_zip", ""),
+                        is_default=bool(pp.get("is_default", True)),
+                    )
+                    if pp.get("is_default", True):
+                        self.repo.set_default_payment_profile(c.id, prof.id)
             self._refresh_customers()
             self._load_center_scope()
 
@@ -651,26 +656,27 @@ class MainWindow(QMainWindow):
                 email=(vals.get("email") or cust.email or "").strip(),
                 notes=(vals.get("notes") or cust.notes or "").strip(),
             )
-            self.repo.update_customer(cid, **cust_fields)
-            pp = vals.get("payment_profile") or {}
-            method = (pp.get("method") or "other").lower()
-            if method != "other":
-                prof = self.repo.create_payment_profile(
-                    customer_id=cid,
-                    method=method,
-                    ach_routing=pp.get("ach_routing", ""),
-                    ach_account=pp.get("ach_account", ""),
-                    card_brand=pp.get("card_brand", ""),
-                    card_last4=pp.get("card_last4", ""),
-                    card_name=pp.get("card_name", ""),
-                    card_exp_month=pp.get("card_exp_month", 0),
-                    card_exp_year=pp.get("card_exp_year", 0),
-                    bill_street=pp.get("bill_street", ""),
-                    bill_city_state_zip=pp.get("bill_city_state_zip", ""),
-                    is_default=bool(pp.get("is_default", True)),
-                )
-                if pp.get("is_default", True):
-                    self.repo.set_default_payment_profile(cid, prof.id)
+            with self.repo.transaction():
+                self.repo.update_customer(cid, **cust_fields)
+                pp = vals.get("payment_profile") or {}
+                method = (pp.get("method") or "other").lower()
+                if method != "other":
+                    prof = self.repo.create_payment_profile(
+                        customer_id=cid,
+                        method=method,
+                        ach_routing=pp.get("ach_routing", ""),
+                        ach_account=pp.get("ach_account", ""),
+                        card_brand=pp.get("card_brand", ""),
+                        card_last4=pp.get("card_last4", ""),
+                        card_name=pp.get("card_name", ""),
+                        card_exp_month=pp.get("card_exp_month", 0),
+                        card_exp_year=pp.get("card_exp_year", 0),
+                        bill_street=pp.get("bill_street", ""),
+                        bill_city_state_zip=pp.get("bill_city_state_zip", ""),
+                        is_default=bool(pp.get("is_default", True)),
+                    )
+                    if pp.get("is_default", True):
+                        self.repo.set_default_payment_profile(cid, prof.id)
             self._refresh_customers()
             self._load_center_scope()
 
@@ -697,9 +703,9 @@ class MainWindow(QMainWindow):
         self._update_invoice_actions_state()
         if not customer_id:
             return
-        for s in self.repo.list_sites_for_customer(customer_id):
-            item = QListWidgetItem(s.name)
-            item.setData(Qt.UserRole, s.id)
+        for s in self.repo.list_site_rows_for_customer(customer_id):
+            item = QListWidgetItem(s["name"])
+            item.setData(Qt.UserRole, s["id"])
             self.list_sites.addItem(item)
 
     def _on_customer_changed(self, cur, prev):
@@ -7,6 +7,10 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout
 from PySide6.QtPdf import QPdfDocument
 from PySide6.QtPdfWidgets import QPdfView
 
+# Qt's QPdfDocument::Error::None; PySide exposes it as None_ (there is no NoError member)
+_NO_ERROR = QPdfDocument.Error.None_ if hasattr(QPdfDocument.Error, "None_") else QPdfDocument.Error.NoError
+
+
 class PdfPreview(QWidget):
     """Silent PDF preview. load_pdf() returns True/False. No message boxes."""
     VERSION = "silent-1"
@@ -14,6 +18,7 @@ class PdfPreview(QWidget):
     def __init__(self, parent: Optional[QWidget] = None):
         super().__init__(parent)
         self._temp_pdf: Optional[str] = None
+        self._owned_temps: set[str] = set()  # paths from new_temp_path(); safe to move
         self.doc = QPdfDocument(self)
         self.view = QPdfView(self)
         self.view.setDocument(self.doc)
@@ -27,13 +32,14 @@ class PdfPreview(QWidget):
     def new_temp_path(self) -> str:
         fd, path = tempfile.mkstemp(prefix="preview_", suffix=".pdf")
         os.close(fd)
+        self._owned_temps.add(path)
         return path
 
     def load_pdf(self, path: str) -> bool:
         if not path or not os.path.isfile(path):
             return False
         status = self.doc.load(path)
-        ok = (self.doc.error() == QPdfDocument.Error.NoError) and (status == QPdfDocument.Error.NoError)
+        ok = (self.doc.error() == _NO_ERROR) and (status == _NO_ERROR)
         if ok:
             self._temp_pdf = path
             self.view.setPageMode(QPdfView.PageMode.MultiPage)
@@ -44,7 +50,21 @@ class PdfPreview(QWidget):
         if not self._temp_pdf or not os.path.isfile(self._temp_pdf):
             return False
         os.makedirs(os.path.dirname(target_path), exist_ok=True)
-        shutil.copyfile(self._temp_pdf, target_path)
+        src = self._temp_pdf
+        if src in self._owned_temps:
+            # our own temp file: a rename moves no bytes. Another filesystem (EXDEV) or
+            # a file still held open (Windows) refuses it; copy in that case.
+            try:
+                os.replace(src, target_path)
+            except OSError:
+                pass
+            else:
+                self._owned_temps.discard(src)
+                self._temp_pdf = target_path
+                return True
+        # copyfile already hands the copy to the kernel (sendfile on Linux,
+        # fcopyfile on macOS), so no Python read/write loop runs here
+        shutil.copyfile(src, target_path)
         return True
 
     def has_preview(self) -> bool:
@@ -1,13 +1,49 @@
 from __future__ import annotations
 # -*- coding: utf-8 -*-
+import functools
 import os, tempfile
 from typing import Optional
 
-from PySide6.QtCore import QTimer
+from PySide6.QtCore import QTimer, QObject, QEvent
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QApplication, QMessageBox
 from PySide6.QtPdf import QPdfDocument
 from PySide6.QtPdfWidgets import QPdfView
 
+# Qt's QPdfDocument::Error::None; PySide exposes it as None_ (there is no NoError member)
+_NO_ERROR = QPdfDocument.Error.None_ if hasattr(QPdfDocument.Error, "None_") else QPdfDocument.Error.NoError
+
+
+def is_preview_box(w) -> bool:
+    """True for the stray 'Preview…' / 'NoError' QMessageBox this app never wants shown."""
+    title = (w.windowTitle() or "").strip()
+    return title.startswith("Preview") or (w.text() or "").strip() == "NoError"
+
+
+class _SilentBoxFilter(QObject):
+    """App-wide filter: a 'Preview… / NoError' QMessageBox is closed as it is shown."""
+    def eventFilter(self, obj, ev):
+        if ev.type() == QEvent.Show and isinstance(obj, QMessageBox) and is_preview_box(obj):
+            # close without user interaction, but only once exec() is running:
+            # done() during Show hides the box and leaves exec() blocked
+            QTimer.singleShot(0, obj.reject)  # done(Rejected)
+        return False
+
+
+_box_filter: Optional[_SilentBoxFilter] = None
+
+
+def install_preview_box_filter():
+    """
+    Install the one _SilentBoxFilter on the application; later calls are no-ops.
+    main.py installs it at startup, SilentPdfPreview on first use otherwise.
+    """
+    global _box_filter
+    app = QApplication.instance()
+    if not app or _box_filter is not None:
+        return
+    _box_filter = _SilentBoxFilter(app)
+    app.installEventFilter(_box_filter)
+
 
 class SilentPdfPreview(QWidget):
     """Silent PDF preview. No message boxes; returns True/False."""
@@ -26,65 +62,35 @@ class SilentPdfPreview(QWidget):
         lay.setContentsMargins(0, 0, 0, 0)
         lay.addWidget(self.view)
 
+        install_preview_box_filter()
+
     def new_temp_path(self) -> str:
         fd, path = tempfile.mkstemp(prefix="preview_", suffix=".pdf")
         os.close(fd)
         return path
 
-    # ---- popup janitor -------------------------------------------------
-    @staticmethod
-    def _sweep_noerror_boxes():
-        """Close any stray QMessageBox that looks like the 'Preview… / NoError' box."""
-        app = QApplication.instance()
-        if not app:
-            return
-        for w in app.topLevelWidgets():
-            if isinstance(w, QMessageBox):
-                title = (w.windowTitle() or "").strip()
-                text = (w.text() or "").strip()
-                if title.startswith("Preview") or text == "NoError":
-                    # close immediately without user interaction
-                    try:
-                        w.done(0)
-                    except Exception:
-                        pass
-                    try:
-                        w.close()
-                    except Exception:
-                        pass
-
     def load_pdf(self, path: str) -> bool:
         """Load a PDF quietly, avoiding Qt's stray 'NoError' popup."""
         if not path or not os.path.isfile(path):
             return False
 
-        # First sweep, in case something fires synchronously
-        SilentPdfPreview._sweep_noerror_boxes()
-
         try:
             status = self.doc.load(path)
         except Exception:
             # Rare QtPdf quirk: schedule async load to avoid native popup
-            QTimer.singleShot(0, lambda p=path: self.doc.load(p))
+            QTimer.singleShot(0, functools.partial(self.doc.load, path))
             self.view.setPageMode(QPdfView.PageMode.MultiPage)
             self.view.setZoomMode(QPdfView.ZoomMode.FitInView)
             self._temp_pdf = path
-            # Sweep again shortly after
-            QTimer.singleShot(0, SilentPdfPreview._sweep_noerror_boxes)
-            QTimer.singleShot(50, SilentPdfPreview._sweep_noerror_boxes)
             return True
 
         ok = (
-            self.doc.error() == QPdfDocument.Error.NoError
-            and status == QPdfDocument.Error.NoError
+            self.doc.error() == _NO_ERROR
+            and status == _NO_ERROR
         )
         if ok:
             self._temp_pdf = path
             self.view.setPageMode(QPdfView.PageMode.MultiPage)
             self.view.setZoomMode(QPdfView.ZoomMode.FitInView)
 
-        # Sweep after successful load, too (some builds show late)
-        QTimer.singleShot(0, SilentPdfPreview._sweep_noerror_boxes)
-        QTimer.singleShot(50, SilentPdfPreview._sweep_noerror_boxes)
-
         return ok
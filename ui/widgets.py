@@ -1,10 +1,16 @@
 from __future__ import annotations
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
-from PySide6.QtGui import QColor
-from PySide6.QtWidgets import QTableView
+from PySide6.QtGui import QBrush, QColor
+from PySide6.QtWidgets import QTableView, QStyledItemDelegate, QDoubleSpinBox
 from models import ServiceOrder
 
 
+# status tints, shared by every row; brushes, so the view paints them as-is
+# instead of converting a QColor on each paint
+_COMPLETED_BG = QBrush(QColor(200, 245, 200))  # deeper green for completed
+_INVOICED_BG = QBrush(QColor(225, 250, 225))   # lighter green for invoiced (but not completed)
+
+
 class SoTableModel(QAbstractTableModel):
     HEADERS = ["Scheduled", "Customer", "Site", "Title", "Completed", "Invoiced"]
 
@@ -13,46 +19,53 @@ class SoTableModel(QAbstractTableModel):
         repo is kept for backward compatibility but unused here (no inline edits).
         """
         super().__init__()
-        self.rows = rows
         self.repo = repo  # not used (no checkboxes / inline update)
+        self._set_rows(rows)
+
+    def _names(self, so) -> tuple[str, str]:
+        return (
+            so.site.customer.name if so.site and so.site.customer else "",
+            so.site.name if so.site else "",
+        )
+
+    def _set_rows(self, rows):
+        # Display text is built once per row, one list per column: data() (called per
+        # cell on every paint and sort compare) is then a single list index.
+        self.rows = rows
+        cells = []
+        for so in rows:
+            cust, site = self._names(so)
+            cells.append((
+                so.scheduled_date.isoformat() if so.scheduled_date else "",
+                cust,
+                site,
+                so.title or "",
+                # simple text status (no checkbox)
+                "Yes" if so.completed else "",
+                "Yes" if so.invoiced else "",
+            ))
+        self._cols = [list(col) for col in zip(*cells)] if cells else [[] for _ in self.HEADERS]
+        self._bg = [
+            _COMPLETED_BG if so.completed else _INVOICED_BG if so.invoiced else None
+            for so in rows
+        ]
 
     # ---- required model API ----
-    def rowCount(self, parent=None):
-        return len(self.rows)
+    # flat table: a valid parent has no children, so the proxy stops descending
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
 
-    def columnCount(self, parent=None):
-        return len(self.HEADERS)
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
 
     def data(self, index: QModelIndex, role=Qt.DisplayRole):
         if not index.isValid():
             return None
-        so = self.rows[index.row()]
-        col = index.column()
-
         if role == Qt.DisplayRole:
-            if col == 0:
-                return so.scheduled_date.isoformat() if so.scheduled_date else ""
-            if col == 1:
-                return so.site.customer.name if so.site and so.site.customer else ""
-            if col == 2:
-                return so.site.name if so.site else ""
-            if col == 3:
-                return so.title or ""
-            if col == 4:
-                # simple text status (no checkbox)
-                return "Yes" if so.completed else ""
-            if col == 5:
-                return "Yes" if so.invoiced else ""
-
+            return self._cols[index.column()][index.row()]
         if role == Qt.BackgroundRole:
             # Visual status (green tints)
-            if so.completed:
-                # Deeper green for completed
-                return QColor(200, 245, 200)
-            elif so.invoiced:
-                # Lighter green for invoiced (but not completed)
-                return QColor(225, 250, 225)
-
+            return self._bg[index.row()]
         return None
 
     def headerData(self, section, orientation, role=Qt.DisplayRole):
@@ -60,19 +73,27 @@ class SoTableModel(QAbstractTableModel):
             return self.HEADERS[section]
         return None
 
+    # Read-only, selectable rows (no checkboxes, no edits); combined once, not per cell
+    _FLAGS_VALID = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+    _FLAGS_INVALID = Qt.ItemIsEnabled
+
     def flags(self, index: QModelIndex):
-        # Read-only, selectable rows (no checkboxes, no edits)
-        if not index.isValid():
-            return Qt.ItemIsEnabled
-        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        return self._FLAGS_VALID if index.isValid() else self._FLAGS_INVALID
 
     # Convenience when resetting rows from the outside
     def setRows(self, rows: list[ServiceOrder]):
         self.beginResetModel()
-        self.rows = rows
+        self._set_rows(rows)
         self.endResetModel()
 
 
+class SoRowTableModel(SoTableModel):
+    """Same columns, fed by Repo.list_calendar_rows() tuples instead of ServiceOrder objects."""
+
+    def _names(self, row) -> tuple[str, str]:
+        return row.customer_name or "", row.site_name or ""
+
+
 class SoTable(QTableView):
     def __init__(self, repo=None):
         super().__init__()
@@ -86,3 +107,34 @@ class SoTable(QTableView):
         super().setModel(model)
         # Auto-size some columns for clarity
         self.resizeColumnsToContents()
+
+    def reset_model(self, model, sort_column: int | None = None, order=Qt.AscendingOrder):
+        """
+        Swap in a freshly built model with sorting and painting suspended, then sort
+        it once (by sort_column, or the current indicator) when sorting turns back on.
+        """
+        self.setUpdatesEnabled(False)
+        self.setSortingEnabled(False)
+        self.setModel(model)
+        if sort_column is not None:
+            self.horizontalHeader().setSortIndicator(sort_column, order)
+        self.setSortingEnabled(True)
+        self.setUpdatesEnabled(True)
+
+
+class PriceDelegate(QStyledItemDelegate):
+    """Spin box editor for a dollar-price column; exists only while a cell is being edited."""
+    def createEditor(self, parent, option, index):
+        spn = QDoubleSpinBox(parent)
+        spn.setRange(0.0, 999999.0)
+        spn.setDecimals(2)
+        spn.setSingleStep(1.00)
+        spn.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        return spn
+
+    def setEditorData(self, editor, index):
+        editor.setValue(float(index.data(Qt.EditRole) or 0.0))
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.EditRole)
@@ -4,7 +4,9 @@
 from __future__ import annotations
 from PySide6.QtWidgets import QFileDialog, QWidget
 
+_ALL_FILES_FILTER = "All Files (*.*)"
+
 
 def pick_file(parent: QWidget) -> str | None:
-    path, _ = QFileDialog.getOpenFileName(parent, "Select File", "", "All Files (*.*)")
+    path, _ = QFileDialog.getOpenFileName(parent, "Select File", "", _ALL_FILES_FILTER)
     return path or None
\ No newline at end of file